@@ -1,6 +1,7 @@
 
 from pathlib import Path
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-ultimate-v8-luxury-key'
@@ -27,6 +28,8 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # Кеш сторінок для анонімних відвідувачів (store/pagecache.py): після CSRF, Auth і Messages
+    'store.pagecache.PageCacheMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -56,6 +59,22 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # BEGIN IMMEDIATE: транзакція бере блокування запису одразу. Транзакція, що почалася з SELECT
+        # (перевірка варіантів, вільного логіна), інакше падає з "database is locked" при паралельному записі
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+        # Тестова БД у файлі, а не в пам'яті: паралельні оформлення в store/tests.py ідуть окремими з'єднаннями
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    }
+}
+
+# Спільний для всіх процесів кеш (воркери сайту й бот): версії кешу, фасети, сторінки, налаштування.
+# Каталог поза кодом проєкту (DJANGO_CACHE_DIR); у продакшені - Redis (django.core.cache.backends.redis.RedisCache)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'deborah_shop_cache')),
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
 
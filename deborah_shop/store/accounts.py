@@ -0,0 +1,43 @@
+"""
+Гостьові акаунти покупців
+- create_guest: користувач з непридатним паролем - без хешування PBKDF2 у запиті оформлення чи в обробнику бота
+- Вхід без пароля одноразовим посиланням (login_path): токен default_token_generator залежить від last_login
+  і пароля, тому посилання перестає діяти після першого входу або встановлення пароля.
+  Сайт посилань сам не надсилає: їх видає адмінка (дія "Посилання для входу" у профілях), менеджер пересилає покупцю
+- Покупець, для якого акаунт щойно створено при оформленні, входить у нього одразу (views.checkout);
+  наявний акаунт за телефоном лише отримує замовлення, входу в нього немає
+- Пароль користувач задає сам у кабінеті; хешування відбувається лише тоді
+"""
+import uuid
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.urls import reverse
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+
+User = get_user_model()
+BACKEND = 'django.contrib.auth.backends.ModelBackend'
+
+
+def create_guest(phone, first_name=''):
+    """Новий користувач для телефону: логін - номер без '+', пароль непридатний (set_unusable_password)"""
+    username = phone.replace('+', '')
+    if User.objects.filter(username=username).exists(): username = f"{username}-{uuid.uuid4().hex[:4]}"
+    user = User(username=username, first_name=first_name)
+    user.set_unusable_password()
+    user.save()
+    # Profile створює сигнал post_save User
+    user.profile.phone = phone
+    user.profile.save(update_fields=['phone'])
+    return user
+
+
+def login_path(user):
+    """Одноразове посилання для входу без пароля (дійсне PASSWORD_RESET_TIMEOUT)"""
+    return reverse('login_link', args=[urlsafe_base64_encode(force_bytes(user.pk)), default_token_generator.make_token(user)])
+
+
+def user_from_link(uidb64, token):
+    try: user = User.objects.get(pk=force_str(urlsafe_base64_decode(uidb64)))
+    except (ValueError, TypeError, OverflowError, User.DoesNotExist): return None
+    return user if default_token_generator.check_token(user, token) else None
@@ -2,10 +2,11 @@ from django.contrib import admin
 from django.utils.html import format_html, mark_safe
 from django import forms
 from django.db.models import Sum, Count
-from .models import Category, Product, ProductImage, Order, OrderItem, Profile, SiteSettings, Review, TickerItem, FONT_CHOICES
+from .models import Category, Product, ProductImage, ProductVariant, Order, OrderItem, Profile, SiteSettings, Review, TickerItem, FONT_CHOICES
 import csv
 from django.http import HttpResponse
 from .models import LandingPage, LandingBlock
+from . import orders, accounts
 
 # ==========================================
 # CUSTOM ACTIONS
@@ -38,16 +39,23 @@ export_orders_csv.short_description = "📥 Експорт в Excel (CSV)"
 
 def mark_as_sent(modeladmin, request, queryset):
     """Позначити як відправлені"""
-    queryset.update(status='sent')
+    queryset.exclude(status='cancelled').update(status='sent')
 mark_as_sent.short_description = "📦 Позначити як 'Відправлено'"
 
 
 def mark_as_done(modeladmin, request, queryset):
     """Позначити як виконані"""
-    queryset.update(status='done')
+    queryset.exclude(status='cancelled').update(status='done')
 mark_as_done.short_description = "✅ Позначити як 'Виконано'"
 
 
+def cancel_orders(modeladmin, request, queryset):
+    """Скасувати і повернути товари на склад"""
+    cancelled = sum(orders.cancel_order(o) for o in queryset)
+    modeladmin.message_user(request, f"Скасовано замовлень: {cancelled}")
+cancel_orders.short_description = "❌ Скасувати (повернути на склад)"
+
+
 # ==========================================
 # SITE SETTINGS ADMIN
 # ==========================================
@@ -276,14 +284,20 @@ class ProductImageInline(admin.TabularInline):
     image_preview.short_description = "Превью"
 
 
+class ProductVariantInline(admin.TabularInline):
+    model = ProductVariant
+    extra = 1
+    fields = ['size', 'color', 'stock']
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ['image_tag', 'name', 'category', 'price_display', 'old_price', 'is_active', 'created_at']
+    list_display = ['image_tag', 'name', 'category', 'price_display', 'old_price', 'units_sold', 'revenue', 'is_active', 'created_at']
     list_filter = ['is_active', 'category', 'created_at']
     search_fields = ['name', 'description']
     list_editable = ['is_active']
     date_hierarchy = 'created_at'
-    inlines = [ProductImageInline]
+    inlines = [ProductVariantInline, ProductImageInline]
     
     fieldsets = (
         ('Основна інформація', {
@@ -301,7 +315,11 @@ class ProductAdmin(admin.ModelAdmin):
         ('Налаштування', {
             'fields': ('is_active',)
         }),
+        ('📈 Продажі', {
+            'fields': (('units_sold', 'revenue'), ('rating_avg', 'rating_count'))
+        }),
     )
+    readonly_fields = ['units_sold', 'revenue', 'rating_avg', 'rating_count']
     
     def image_tag(self, obj):
         if obj.image:
@@ -341,7 +359,7 @@ class OrderAdmin(admin.ModelAdmin):
     list_editable = ['tracking_number']
     date_hierarchy = 'created_at'
     inlines = [OrderItemInline]
-    actions = [export_orders_csv, mark_as_sent, mark_as_done]
+    actions = [export_orders_csv, mark_as_sent, mark_as_done, cancel_orders]
     
     fieldsets = (
         ('📋 Інформація про замовлення', {
@@ -360,6 +378,17 @@ class OrderAdmin(admin.ModelAdmin):
     
     readonly_fields = ['id', 'created_at', 'source']
     
+    def save_model(self, request, obj, form, change):
+        # Скасування проходить через orders.cancel_order, щоб залишки повернулися рівно один раз;
+        # скасоване замовлення не відновлюється (товар могли вже продати)
+        status_changed = change and 'status' in form.changed_data
+        cancel = status_changed and obj.status == 'cancelled'
+        if cancel or (status_changed and form.initial.get('status') == 'cancelled'):
+            if not cancel: self.message_user(request, "Скасоване замовлення не можна відновити", level='warning')
+            obj.status = form.initial.get('status')
+        super().save_model(request, obj, form, change)
+        if cancel: orders.cancel_order(obj)
+    
     def id_display(self, obj):
         return format_html('<strong style="color: #007bff;">#{}</strong>', obj.id)
     id_display.short_description = "ID"
@@ -380,7 +409,8 @@ class OrderAdmin(admin.ModelAdmin):
         colors = {
             'new': '#007bff',
             'sent': '#ffc107',
-            'done': '#28a745'
+            'done': '#28a745',
+            'cancelled': '#dc3545'
         }
         return format_html(
             '<span style="background: {}; color: white; padding: 5px 10px; border-radius: 12px; font-size: 11px; font-weight: 600;">{}</span>',
@@ -431,6 +461,13 @@ class ReviewAdmin(admin.ModelAdmin):
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'phone', 'orders_count', 'total_spent']
     search_fields = ['user__username', 'phone']
+    actions = ['issue_login_links']
+    
+    def issue_login_links(self, request, queryset):
+        """Одноразові посилання для входу без пароля (гостьові акаунти з оформлення / бота)"""
+        for profile in queryset.select_related('user'):
+            self.message_user(request, f"{profile.user.username}: {request.build_absolute_uri(accounts.login_path(profile.user))}")
+    issue_login_links.short_description = "🔗 Посилання для входу"
     
     def orders_count(self, obj):
         count = obj.user.order_set.count()
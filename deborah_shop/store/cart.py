@@ -0,0 +1,150 @@
+"""
+Кошик покупця
+- Позиції зберігаються в БД (Cart / CartLine), у сесії лише id кошика: сесія пишеться один раз, а не на кожен клік
+- Зміна кількості - один UPDATE з F('quantity') + n, без читання-зміни-запису
+- Товари всіх позицій завантажуються одним запитом при першому зверненні до lines / total
+- Неактивні та видалені товари пропускаються явно (і не потрапляють у замовлення)
+- Лічильник у шапці береться з кешу, тож звичайна сторінка не робить запитів до кошика
+- Після входу анонімний кошик зливається з кошиком користувача (merge_on_login)
+"""
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import Cart as CartStore, CartLine
+
+SESSION_KEY = 'cart_id'
+LEGACY_SESSION_KEY = 'cart'
+COUNT_TIMEOUT = 60 * 60 * 24
+# Анонімні кошики без змін довше цього видаляє manage.py clear_carts
+CART_TTL = timedelta(days=30)
+
+
+def count_key(cart_id):
+    return f"cart:{cart_id}:count"
+
+
+class Cart:
+    def __init__(self, request):
+        self.session = request.session
+        self.user = request.user if request.user.is_authenticated else None
+        self.id = self.session.get(SESSION_KEY)
+        self._lines = None
+        if LEGACY_SESSION_KEY in self.session: self._import_legacy()
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def _get_id(self, create=False):
+        """id кошика з сесії; для користувача - його кошик у БД; create=True створює кошик при першому додаванні"""
+        if self.id is None and (self.user or create):
+            if self.user: self.id = CartStore.objects.get_or_create(user=self.user)[0].id
+            else: self.id = CartStore.objects.create().id
+            self.session[SESSION_KEY] = self.id
+        return self.id
+
+    def _import_legacy(self):
+        """Кошик старого формату ({id: кількість} у сесії) переноситься в БД один раз"""
+        for pid, qty in self.session.pop(LEGACY_SESSION_KEY).items():
+            if str(pid).isdigit() and isinstance(qty, int) and qty > 0: self.add(int(pid), qty)
+
+    @property
+    def count(self):
+        """Кількість одиниць для лічильника: з кешу, запит до БД лише після зміни кошика"""
+        cart_id = self._get_id()
+        if cart_id is None: return 0
+        return cache.get_or_set(
+            count_key(cart_id),
+            lambda: CartLine.objects.filter(cart_id=cart_id, quantity__gt=0, product__is_active=True).aggregate(n=Sum('quantity'))['n'] or 0,
+            COUNT_TIMEOUT,
+        )
+
+    @property
+    def lines(self):
+        """[{'product', 'variant', 'qty', 'total', 'available'}] у порядку додавання, тільки активні товари"""
+        if self._lines is None:
+            cart_id = self._get_id()
+            rows = (
+                CartLine.objects.filter(cart_id=cart_id, quantity__gt=0, product__is_active=True)
+                .select_related('product', 'variant').order_by('id') if cart_id else []
+            )
+            self._lines = [{
+                'product': row.product, 'variant': row.variant, 'qty': row.quantity, 'total': row.product.price * row.quantity,
+                'available': row.variant is None or row.variant.stock >= row.quantity,
+            } for row in rows]
+        return self._lines
+
+    @property
+    def total(self):
+        return sum((line['total'] for line in self.lines), 0)
+
+    def quantity(self, product_id, variant_id=None):
+        """Кількість позиції в кошику, 0 - позиції немає"""
+        if self._get_id() is None: return 0
+        line = CartLine.objects.filter(cart_id=self.id, product_id=product_id, variant_id=variant_id)
+        return line.values_list('quantity', flat=True).first() or 0
+
+    def add(self, product_id, qty=1, variant_id=None):
+        """Атомарно змінює кількість (qty < 0 - зменшує); позиції з кількістю <= 0 видаляються"""
+        cart_id = self._get_id(create=qty > 0)
+        if cart_id is None: return
+        line = CartLine.objects.filter(cart_id=cart_id, product_id=product_id, variant_id=variant_id)
+        if not line.update(quantity=F('quantity') + qty) and qty > 0:
+            try:
+                with transaction.atomic(): CartLine.objects.create(cart_id=cart_id, product_id=product_id, variant_id=variant_id, quantity=qty)
+            except IntegrityError:
+                if not CartStore.objects.filter(pk=cart_id).exists():
+                    # Кошик із сесії вже видалено (прострочений) - починаємо новий
+                    self.id = self.session[SESSION_KEY] = None
+                    return self.add(product_id, qty, variant_id)
+                # Паралельний запит уже створив рядок - додаємо до нього; неіснуючий товар просто ігнорується
+                line.update(quantity=F('quantity') + qty)
+        if qty < 0: line.filter(quantity__lte=0).delete()
+        self._changed()
+
+    def remove(self, product_id, variant_id=None):
+        if self._get_id() is None: return
+        CartLine.objects.filter(cart_id=self.id, product_id=product_id, variant_id=variant_id).delete()
+        self._changed()
+
+    def clear(self):
+        if self._get_id() is None: return
+        CartLine.objects.filter(cart_id=self.id).delete()
+        self._changed()
+
+    def _changed(self):
+        CartStore.objects.filter(pk=self.id).update(updated_at=timezone.now())
+        cache.delete(count_key(self.id))
+        self._lines = None
+
+
+def forget_counts(product_id):
+    """Товар приховано / змінено: лічильники кошиків з ним перераховуються (як і lines, без неактивних товарів)"""
+    cache.delete_many([count_key(cart_id) for cart_id in CartLine.objects.filter(product_id=product_id).values_list('cart_id', flat=True)])
+
+
+def merge_on_login(request, user):
+    """Позиції анонімного кошика сесії додаються до кошика користувача, анонімний кошик видаляється"""
+    anon_id = request.session.get(SESSION_KEY)
+    user_cart, _ = CartStore.objects.get_or_create(user=user)
+    request.session[SESSION_KEY] = user_cart.id
+    if not anon_id or anon_id == user_cart.id: return
+    anon = CartStore.objects.filter(pk=anon_id, user__isnull=True).first()
+    if anon is None: return
+    with transaction.atomic():
+        existing = set(CartLine.objects.filter(cart=user_cart).values_list('product_id', 'variant_id'))
+        lines = list(CartLine.objects.filter(cart=anon, quantity__gt=0).values_list('product_id', 'variant_id', 'quantity'))
+        for pid, vid, qty in lines:
+            if (pid, vid) in existing: CartLine.objects.filter(cart=user_cart, product_id=pid, variant_id=vid).update(quantity=F('quantity') + qty)
+        CartLine.objects.bulk_create([
+            CartLine(cart=user_cart, product_id=pid, variant_id=vid, quantity=qty) for pid, vid, qty in lines if (pid, vid) not in existing
+        ])
+        anon.delete()
+    CartStore.objects.filter(pk=user_cart.pk).update(updated_at=timezone.now())
+    cache.delete(count_key(user_cart.id))
+
+
+def expired():
+    """Анонімні кошики, що не змінювалися довше CART_TTL"""
+    return CartStore.objects.filter(user__isnull=True, updated_at__lt=timezone.now() - CART_TTL)
@@ -0,0 +1,107 @@
+"""
+Каталог товарів для головної сторінки
+- Легка проекція картки (тільки поля, які показує сітка)
+- Keyset-пагінація по (ключ сортування, id) замість OFFSET
+- Пошук (?q=): ранжування FTS5 (store/search.py), курсор - позиція в рейтингу
+"""
+import base64
+import binascii
+from decimal import Decimal
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from .models import Product
+from . import search, facets
+
+PAGE_SIZE = 24
+
+# Поля, які реально використовує картка товару (store/product_grid.html)
+CARD_FIELDS = ('id', 'name', 'price', 'image', 'created_at', 'units_sold', 'category__name')
+
+
+def card_queryset():
+    return Product.objects.filter(is_active=True).select_related('category').only(*CARD_FIELDS)
+
+
+def filter_products(products, params):
+    """Фасетні фільтри з GET-параметрів (store/facets.py); пошук (?q=) застосовує get_page"""
+    return facets.apply_filters(products, facets.parse_filters(params), exclude='q')
+
+
+# Режим сортування -> (поле, за спаданням, розбір значення з курсора); id - завжди другий ключ
+SORTS = {
+    'new': ('created_at', True, parse_datetime),
+    'price_asc': ('price', False, Decimal),
+    'price_desc': ('price', True, Decimal),
+    'popular': ('units_sold', True, int),
+}
+DEFAULT_SORT = 'new'
+
+
+def get_sort(params):
+    sort = params.get('sort')
+    return sort if sort in SORTS else DEFAULT_SORT
+
+
+def encode_cursor(sort, product):
+    field = SORTS[sort][0]
+    value = getattr(product, field)
+    raw = f"{sort}|{value.isoformat() if field == 'created_at' else value}|{product.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(sort, cursor):
+    """(значення, id) або None, якщо курсор битий чи від іншого сортування"""
+    try:
+        cursor_sort, value, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        if cursor_sort != sort: return None
+        value = SORTS[sort][2](value)
+        return (value, int(pk)) if value is not None else None
+    except (ValueError, ArithmeticError, UnicodeError, binascii.Error):
+        return None
+
+
+def get_page(products, params, size=PAGE_SIZE):
+    """
+    Повертає (товари, курсор наступної сторінки) для відфільтрованого queryset
+    Пошук без явного ?sort= впорядковується за релевантністю, інакше - keyset за обраним режимом
+    """
+    q = params.get('q')
+    if q and params.get('sort') not in SORTS: return search_page(products, q, params.get('cursor'), size)
+    if q: products = products.filter(id__in=search.search_ids(q))
+    return keyset_page(products, get_sort(params), params.get('cursor'), size)
+
+
+def keyset_queryset(products, sort=DEFAULT_SORT, cursor=None):
+    """Queryset, впорядкований за режимом sort, що починається одразу після курсора"""
+    field, desc, _ = SORTS[sort]
+    sign = '-' if desc else ''
+    products = products.order_by(f'{sign}{field}', f'{sign}id')
+    position = decode_cursor(sort, cursor) if cursor else None
+    if position:
+        value, pk = position
+        op = 'lt' if desc else 'gt'
+        # Діапазон по першому ключу окремою умовою, щоб SQLite читав індекс з позиції курсора
+        products = products.filter(Q(**{f'{field}__{op}e': value}), Q(**{f'{field}__{op}': value}) | Q(**{f'id__{op}': pk}))
+    return products
+
+
+def keyset_page(products, sort=DEFAULT_SORT, cursor=None, size=PAGE_SIZE):
+    """Бере size + 1 рядок, щоб дізнатися, чи є наступна сторінка, без COUNT(*)"""
+    items = list(keyset_queryset(products, sort, cursor)[:size + 1])
+    next_cursor = encode_cursor(sort, items[size - 1]) if len(items) > size else None
+    return items[:size], next_cursor
+
+
+def search_page(products, q, cursor=None, size=PAGE_SIZE):
+    """
+    Сторінка результатів пошуку в порядку релевантності
+    Рейтинг обмежений search.SEARCH_LIMIT, тому курсор - просто зсув у ньому
+    """
+    ranked = search.search_ids(q)
+    allowed = set(products.filter(id__in=ranked).values_list('id', flat=True))
+    ranked = [pk for pk in ranked if pk in allowed]
+    offset = int(cursor) if cursor and cursor.isdigit() else 0
+    window = ranked[offset:offset + size]
+    found = products.in_bulk(window)
+    next_cursor = str(offset + size) if offset + size < len(ranked) else None
+    return [found[pk] for pk in window if pk in found], next_cursor
@@ -0,0 +1,96 @@
+"""
+Умовні GET (ETag / Last-Modified): повторний візит чи краулер отримує 304 після одного запиту
+по індексу, без рендеру сторінки
+- Час зміни - updated_at товару або промо-сторінки (з товарами її блоків) і site.changed_at() для оформлення
+- Сторінки з шапкою вітрини показують лічильники кошика й обраного та CSRF-токен, тому їх ETag містить
+  і стан відвідувача; відвідувач з повідомленнями (messages) отримує сторінку повністю
+- Значення рахуються один раз на запит: condition() викликає і etag_func, і last_modified_func
+"""
+import hashlib
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+from .cart import Cart
+from .models import Product, LandingPage
+from . import site, translations
+
+
+def _memo(request, name, load):
+    stamps = request.__dict__.setdefault('_conditional', {})
+    if name not in stamps: stamps[name] = load()
+    return stamps[name]
+
+
+def _latest(*stamps):
+    stamps = [s for s in stamps if s]
+    return max(stamps) if stamps else None
+
+
+def _etag(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def visitor(request):
+    """Стан відвідувача, що є в HTML шапки"""
+    return (
+        translations.get_language(request), request.user.pk, request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        Cart(request).count, tuple(request.session.get('favorites', [])),
+    )
+
+
+def product_changed(product_id):
+    return Product.objects.filter(pk=product_id).values_list('updated_at', flat=True).first()
+
+
+def landing_changed(slug):
+    row = (
+        LandingPage.objects.filter(slug=slug, is_active=True)
+        .annotate(products_at=Max('blocks__products_category__product__updated_at'))
+        .values_list('updated_at', 'products_at').first()
+    )
+    return _latest(*row) if row else None
+
+
+def storefront(changed):
+    """condition() для сторінки вітрини; changed(**kwargs view) - час зміни вмісту або None (сторінки немає)"""
+    def last_modified(request, **kwargs):
+        if len(get_messages(request)): return None
+        stamp = _memo(request, 'changed', lambda: changed(**kwargs))
+        return _latest(stamp, site.changed_at()) if stamp else None
+
+    def etag(request, **kwargs):
+        modified = last_modified(request, **kwargs)
+        return _etag(modified.isoformat(), visitor(request)) if modified else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def _fragment_modified(request, product_id):
+    stamp = _memo(request, 'changed', lambda: product_changed(product_id))
+    return _latest(stamp, site.changed_at()) if stamp else None
+
+
+def _fragment_etag(request, product_id):
+    modified = _fragment_modified(request, product_id)
+    return _etag(modified.isoformat()) if modified else None
+
+
+def _sitemap_state(request):
+    # Кількість активних товарів ловить видалення і приховування, яких не видно в Max(updated_at)
+    return _memo(request, 'sitemap', lambda: Product.objects.filter(is_active=True).aggregate(last=Max('updated_at'), n=Count('id')))
+
+
+def _sitemap_modified(request, **kwargs):
+    return _latest(_sitemap_state(request)['last'], site.changed_at())
+
+
+def _sitemap_etag(request, **kwargs):
+    return _etag(str(_sitemap_modified(request)), _sitemap_state(request)['n'])
+
+
+product_page = storefront(product_changed)
+landing_page = storefront(landing_changed)
+# Фрагмент модального вікна не містить даних відвідувача
+product_fragment = condition(etag_func=_fragment_etag, last_modified_func=_fragment_modified)
+sitemap = condition(etag_func=_sitemap_etag, last_modified_func=_sitemap_modified)
@@ -0,0 +1,137 @@
+"""
+Фасетні фільтри каталогу: розмір, колір, ціна, категорія
+- Розміри/кольори з Product.sizes / colors розкладаються в ProductAttribute при збереженні товару
+- Лічильники всіх фасетів рахуються одним UNION ALL запитом і кешуються на комбінацію фільтрів
+- Лічильник фасету враховує всі фільтри, крім власного (можна обрати кілька розмірів одразу)
+"""
+import hashlib
+from django.core.cache import cache
+from django.db.models import Case, When, Value, CharField, Count, Q
+from .models import Product, ProductAttribute
+from . import search, versions
+
+ATTRIBUTE_KINDS = ('size', 'color')
+
+# Ключ кошика -> [від, до)
+PRICE_BUCKETS = {
+    '0-500': (0, 500),
+    '500-1000': (500, 1000),
+    '1000-2000': (1000, 2000),
+    '2000+': (2000, None),
+}
+
+CACHE_TIMEOUT = 60 * 15
+VERSION_KEY = 'facets:version'
+
+
+def split_values(raw):
+    seen = {}
+    for v in (raw or '').split(','):
+        v = v.strip()
+        if v and v.lower() not in seen: seen[v.lower()] = v
+    return list(seen.values())
+
+
+def sync_product(product):
+    """Перезаписує атрибути товару з його полів sizes / colors"""
+    ProductAttribute.objects.filter(product=product).delete()
+    ProductAttribute.objects.bulk_create(
+        [ProductAttribute(product=product, kind='size', value=v[:50]) for v in split_values(product.sizes)] +
+        [ProductAttribute(product=product, kind='color', value=v[:50]) for v in split_values(product.colors)]
+    )
+
+
+EMPTY = {'q': '', 'category': '', 'size': [], 'color': [], 'price': []}
+
+
+def parse_filters(params):
+    """GET-параметри -> нормалізований словник фільтрів"""
+    return {
+        'q': (params.get('q') or '').strip(),
+        'category': params.get('category') or '',
+        'size': sorted(set(params.getlist('size'))),
+        'color': sorted(set(params.getlist('color'))),
+        'price': sorted(k for k in set(params.getlist('price')) if k in PRICE_BUCKETS),
+    }
+
+
+def price_q(keys):
+    q = Q()
+    for key in keys:
+        lo, hi = PRICE_BUCKETS[key]
+        q |= Q(price__gte=lo, price__lt=hi) if hi is not None else Q(price__gte=lo)
+    return q
+
+
+def apply_filters(products, filters, exclude=None):
+    """Фільтрує queryset; exclude - фасет, власний фільтр якого пропускається"""
+    if filters['q'] and exclude != 'q': products = products.filter(id__in=search.search_ids(filters['q']))
+    if filters['category'] and exclude != 'category': products = products.filter(category__slug=filters['category'])
+    for kind in ATTRIBUTE_KINDS:
+        if filters[kind] and exclude != kind:
+            ids = ProductAttribute.objects.filter(kind=kind, value__in=filters[kind]).values('product_id')
+            products = products.filter(id__in=ids)
+    if filters['price'] and exclude != 'price': products = products.filter(price_q(filters['price']))
+    return products
+
+
+def price_bucket():
+    return Case(
+        *[When(price_q([key]), then=Value(key)) for key in PRICE_BUCKETS],
+        output_field=CharField(),
+    )
+
+
+def facet_counts(products, filters):
+    """
+    {'size': {'M': 3, ...}, 'color': {...}, 'price': {...}, 'category': {slug: n}}
+    Один запит: UNION ALL згрупованих підзапитів, по одному на фасет
+    """
+    key = cache_key(filters)
+    counts = cache.get(key)
+    if counts is not None: return counts
+
+    # Пошук звужує базу один раз, а не в кожному підзапиті
+    if filters['q']: products = apply_filters(products, {**EMPTY, 'q': filters['q']})
+    filters = {**filters, 'q': ''}
+    parts = [
+        ProductAttribute.objects.filter(kind=kind, product__in=apply_filters(products, filters, exclude=kind))
+        .values_list('kind', 'value').annotate(n=Count('product_id')).order_by()
+        for kind in ATTRIBUTE_KINDS
+    ]
+    parts.append(
+        apply_filters(products, filters, exclude='price').annotate(facet=Value('price'), bucket=price_bucket())
+        .values_list('facet', 'bucket').annotate(n=Count('id')).order_by()
+    )
+    parts.append(
+        apply_filters(products, filters, exclude='category').annotate(facet=Value('category'))
+        .values_list('facet', 'category__slug').annotate(n=Count('id')).order_by()
+    )
+    counts = {facet: {} for facet in (*ATTRIBUTE_KINDS, 'price', 'category')}
+    for facet, value, n in parts[0].union(*parts[1:], all=True):
+        if value is not None: counts[facet][value] = n
+    cache.set(key, counts, CACHE_TIMEOUT)
+    return counts
+
+
+def cache_key(filters):
+    raw = repr(sorted(filters.items()))
+    return f"facets:{versions.get(VERSION_KEY)}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def invalidate():
+    """Скидає кеш лічильників після змін у товарах / категоріях (після коміту)"""
+    versions.bump(VERSION_KEY)
+
+
+def facet_choices(counts, filters):
+    """Лічильники -> пункти для шаблону: [{'value', 'count', 'checked'}]"""
+    size_order = {v: i for i, (v, _) in enumerate(Product.SIZE_CHOICES)}
+    choices = {}
+    for kind in ATTRIBUTE_KINDS:
+        values = {**{v: 0 for v in filters[kind]}, **counts[kind]}
+        ordered = sorted(values, key=lambda v: (size_order.get(v, len(size_order)), v) if kind == 'size' else v.lower())
+        choices[kind] = [{'value': v, 'count': values[v], 'checked': v in filters[kind]} for v in ordered]
+    choices['price'] = [{'value': k, 'count': counts['price'].get(k, 0), 'checked': k in filters['price']} for k in PRICE_BUCKETS]
+    choices['category'] = counts['category']
+    return choices
@@ -0,0 +1,59 @@
+"""
+Промо-сторінки (LandingPage)
+- load_blocks: блоки сторінки одним запитом, товари всіх блоків "Товари" ще одним:
+  ROW_NUMBER() у межах категорії обмежує вибірку в SQL, лише активні товари, новіші першими
+- render_blocks: готовий HTML блоків з кешу, ключ - сторінка, мова і версія;
+  версія збільшується після коміту змін промо-сторінок, блоків, товарів і категорій (сигнали)
+"""
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from .models import Product
+from . import translations, versions
+
+VERSION_KEY = 'landing:version'
+TIMEOUT = 60 * 60
+
+
+def _limit(block):
+    return max(block.products_limit or 0, 0) if block.block_type == 'products' and block.products_category_id else 0
+
+
+def load_blocks(page):
+    """Блоки з атрибутом products (список товарів блоку)"""
+    blocks = list(page.blocks.all())
+    limits = {}
+    for block in blocks:
+        if _limit(block): limits[block.products_category_id] = max(limits.get(block.products_category_id, 0), _limit(block))
+    by_category = {}
+    if limits:
+        products = (
+            Product.objects.filter(is_active=True, category_id__in=limits)
+            .only('id', 'category_id', 'name', 'price', 'image', 'created_at')
+            .annotate(row=Window(RowNumber(), partition_by=F('category_id'), order_by=[F('created_at').desc(), F('id').desc()]))
+            .filter(row__lte=max(limits.values()))
+            .order_by('category_id', 'row')
+        )
+        for product in products: by_category.setdefault(product.category_id, []).append(product)
+    for block in blocks: block.products = by_category.get(block.products_category_id, [])[:_limit(block)]
+    return blocks
+
+
+def page_key(page, lang):
+    return f"landing:{versions.get(VERSION_KEY)}:{page.pk}:{lang}"
+
+
+def render_blocks(request, page):
+    lang = translations.get_language(request)
+    key = page_key(page, lang)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string('store/landing_blocks.html', {'blocks': load_blocks(page), 'lang': lang, 't': translations.catalog(lang)})
+        cache.set(key, str(html), TIMEOUT)
+    return mark_safe(html)
+
+
+def invalidate():
+    versions.bump(VERSION_KEY)
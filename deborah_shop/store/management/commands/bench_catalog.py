@@ -0,0 +1,68 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import QueryDict
+from django.utils import timezone
+from store import catalog, sales
+from store.models import Category, Product, Order, OrderItem
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк сортувань каталогу: план запиту SQLite і час сторінки на синтетичному каталозі (окрема тимчасова БД)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(options['products'], options['categories'])
+            self.run(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, n_products, n_categories):
+        started = time.perf_counter()
+        rnd = random.Random(42)
+        cats = Category.objects.bulk_create([Category(name=f'Cat {i}', slug=f'cat-{i}') for i in range(n_categories)])
+        now = timezone.now()
+        Product.objects.bulk_create([
+            Product(category=rnd.choice(cats), name=f'Product {i}', price=rnd.randint(100, 5000), is_active=rnd.random() > 0.1)
+            for i in range(n_products)
+        ], batch_size=5000)
+        # created_at має auto_now_add, тому розкидаємо дати окремим UPDATE
+        with connection.cursor() as c:
+            c.execute("UPDATE store_product SET created_at = datetime(%s, '-' || (abs(random()) %% 31536000) || ' seconds')", [now.isoformat()])
+        ids = list(Product.objects.values_list('id', flat=True))
+        orders = Order.objects.bulk_create([Order(first_name='Bench', phone='0', city='-', nova_poshta='-') for _ in range(n_products // 10)], batch_size=5000)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=o, product_id=rnd.choice(ids), price=100, quantity=rnd.randint(1, 3))
+            for o in orders for _ in range(3)
+        ], batch_size=5000)
+        sales.reconcile()
+        with connection.cursor() as c: c.execute("ANALYZE")
+        self.stdout.write(f"Каталог: {n_products} товарів, {n_categories} категорій, {len(orders)} замовлень ({time.perf_counter() - started:.1f} с)\n")
+
+    def run(self, repeat):
+        slug = Category.objects.values_list('slug', flat=True).first()
+        for sort in catalog.SORTS:
+            for label, params in (('усі', QueryDict()), ('категорія', QueryDict(f'category={slug}'))):
+                products = catalog.filter_products(catalog.card_queryset(), params)
+                # Курсор з середини каталогу: глибока сторінка коштує стільки ж, скільки перша
+                middle = catalog.keyset_queryset(products, sort)[products.count() // 2]
+                cursor = catalog.encode_cursor(sort, middle)
+                self.stdout.write(self.style.MIGRATE_HEADING(f"[{sort}] {label}"))
+                self.stdout.write(catalog.keyset_queryset(products, sort, cursor)[:catalog.PAGE_SIZE + 1].explain())
+                for page, c in (('перша', None), ('середина', cursor)):
+                    timings = []
+                    for _ in range(repeat):
+                        t = time.perf_counter()
+                        catalog.keyset_page(products, sort, c)
+                        timings.append((time.perf_counter() - t) * 1000)
+                    self.stdout.write(f"  {page:<9} медіана {statistics.median(timings):7.2f} мс, макс {max(timings):7.2f} мс")
+                self.stdout.write('')
@@ -0,0 +1,107 @@
+import statistics
+import time
+import uuid
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.shortcuts import redirect, render
+from django.test import RequestFactory
+from store import orders, views
+from store.cart import Cart
+from store.models import Category, Product, Profile, Order, OrderItem
+
+
+def legacy_checkout(request):
+    """POST /checkout/ до змін: акаунт з паролем (PBKDF2), товар і позиція - окремими запитами, кошик у сесії"""
+    cart = request.session.get('cart', {})
+    if not cart: return redirect('home')
+    phone = request.POST.get('phone')
+    first_name = request.POST.get('first_name')
+    pay_method = request.POST.get('payment')
+    user = request.user if request.user.is_authenticated else None
+    if not user:
+        try: user = Profile.objects.get(phone=phone).user
+        except:
+            pw = str(uuid.uuid4())[:8]
+            username = phone.replace('+', '')
+            user = User.objects.create_user(username=username, password=pw, first_name=first_name)
+            profile, _ = Profile.objects.get_or_create(user=user)
+            profile.phone = phone
+            profile.save()
+            messages.info(request, f"Аккаунт создан! Логин: {username}")
+    total = 0
+    items = []
+    for pid, qty in cart.items():
+        try:
+            p = Product.objects.get(id=int(pid))
+            total += p.price * qty
+            items.append((p, qty))
+        except: pass
+    order = Order.objects.create(
+        user=user, first_name=first_name, last_name=request.POST.get('last_name'), phone=phone,
+        city=request.POST.get('city_name') or request.POST.get('city', 'Unknown'), city_ref=request.POST.get('city_ref', ''),
+        nova_poshta=request.POST.get('warehouse_name') or request.POST.get('nova_poshta', 'Unknown'),
+        warehouse_ref=request.POST.get('warehouse_ref', ''), payment_method=pay_method, total_price=total, source='site'
+    )
+    for p, qty in items: OrderItem.objects.create(order=order, product=p, price=p.price, quantity=qty)
+    request.session['cart'] = {}
+    return render(request, 'store/success.html', {'order': order})
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк оформлення замовлення новим покупцем: попередній view (акаунт з паролем) проти поточного (окрема тимчасова БД)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--lines', type=int, default=3, help='Позицій у кошику')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.run(options['repeat'], options['lines'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def report(self, label, timings):
+        self.stdout.write(f"  {label:<30} медіана {statistics.median(timings):8.2f} мс, макс {max(timings):8.2f} мс")
+
+    def request(self, phone):
+        """Анонімний POST /checkout/ з сесією і повідомленнями, як після middleware"""
+        request = RequestFactory().post('/checkout/', {
+            'phone': phone, 'first_name': 'Bench', 'last_name': 'Bench', 'payment': 'cod', 'checkout_key': orders.new_checkout_key(),
+        })
+        SessionMiddleware(lambda r: None).process_request(request)
+        MessageMiddleware(lambda r: None).process_request(request)
+        request.user = AnonymousUser()
+        return request
+
+    def measure(self, view, request):
+        t = time.perf_counter()
+        response = view(request)
+        elapsed = (time.perf_counter() - t) * 1000
+        assert response.status_code == 200, response.status_code
+        return elapsed
+
+    def run(self, repeat, n_lines):
+        cat = Category.objects.create(name='Bench', slug='bench')
+        products = [Product.objects.create(category=cat, name=f'Product {i}', price=100 + i) for i in range(n_lines)]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"POST /checkout/ новим покупцем, {n_lines} позицій ({repeat} разів)"))
+        before, after = [], []
+        for i in range(repeat):
+            # Кошик наповнюється до заміру: у кожному варіанті - у своєму форматі
+            request = self.request(f'+38050{i:07d}')
+            request.session['cart'] = {str(p.id): 1 for p in products}
+            before.append(self.measure(legacy_checkout, request))
+
+            request = self.request(f'+38067{i:07d}')
+            cart = Cart(request)
+            for p in products: cart.add(p.id)
+            after.append(self.measure(views.checkout, request))
+        self.report('до (create_user з паролем)', before)
+        self.report('після (гостьовий акаунт)', after)
+        self.stdout.write(f"  Прискорення медіани: x{statistics.median(before) / statistics.median(after):.1f}")
@@ -0,0 +1,60 @@
+import statistics
+import time
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+from django.test import RequestFactory
+from django.urls import resolve
+from store import translations, context_processors
+
+TEMPLATE = Template('{{ t.home }} {{ t.collection }} {{ t.cart }} {{ t.composition_text }} {{ t.delivery_text }} {{ t.submit|upper }}')
+
+
+class Command(BaseCommand):
+    help = 'Мікробенчмарк context_processors.global_context: попередній (словники UK/EN у кожному запиті) проти поточного, для вітрини й адмінки'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20000)
+
+    def report(self, label, timings):
+        self.stdout.write(f"  {label:<30} медіана {statistics.median(timings):8.2f} мкс, макс {max(timings):8.2f} мкс")
+
+    def run_case(self, repeat, fn):
+        timings = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - t) * 1e6)
+        return timings
+
+    def request(self, path):
+        """GET з сесією і визначеним view, як після middleware"""
+        request = RequestFactory().get(path, HTTP_COOKIE='lang=en')
+        SessionMiddleware(lambda r: None).process_request(request)
+        request.user = AnonymousUser()
+        request.resolver_match = resolve(path)
+        return request
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        # Попередній процесор: обидва словники створюються заново на кожен запит, вітрина чи адмінка
+        raw = {lang: dict(translations.CATALOGS[lang]._messages) for lang in translations.LANGUAGES}
+
+        def old(request):
+            cart = request.session.get('cart', {})
+            favs = request.session.get('favorites', [])
+            lang = request.COOKIES.get('lang', 'uk')
+            built = {lang: dict(messages) for lang, messages in raw.items()}
+            return {'cart_count': sum(cart.values()), 'fav_count': len(favs), 'lang': lang, 't': built.get(lang, built['uk'])}
+
+        for label, path in (('Вітрина', '/'), ('Адмінка', '/admin/')):
+            request = self.request(path)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"global_context: {label} {path} ({repeat} разів)"))
+            self.report('до (словники в кожному запиті)', self.run_case(repeat, lambda: old(request)))
+            self.report('після', self.run_case(repeat, lambda: context_processors.global_context(request)))
+
+        request = self.request('/')
+        self.stdout.write(self.style.MIGRATE_HEADING("Рендер шаблону з t"))
+        self.report('словник', self.run_case(repeat, lambda: TEMPLATE.render(Context(old(request)))))
+        self.report('каталог', self.run_case(repeat, lambda: TEMPLATE.render(Context(context_processors.global_context(request)))))
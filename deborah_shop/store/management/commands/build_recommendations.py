@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from store import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Рекомендації "разом купують": інкрементальна обробка нових замовлень (--full - перерахунок з нуля)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Перерахувати всю історію замовлень')
+        parser.add_argument('--chunk-size', type=int, default=recommendations.CHUNK_SIZE)
+        parser.add_argument('--top', type=int, default=recommendations.TOP_N)
+        parser.add_argument('--batch', type=int, default=recommendations.BATCH_ORDERS, help='Замовлень на транзакцію')
+
+    def handle(self, *args, **options):
+        until, touched = recommendations.update(full=options['full'], chunk_size=options['chunk_size'], top_n=options['top'], batch=options['batch'])
+        self.stdout.write(f"✅ Оброблено замовлення до #{until}, оновлено рекомендацій товарів: {touched}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from store import site, theme
+from store.models import SiteSettings
+
+
+class Command(BaseCommand):
+    help = 'Компіляція CSS теми з SiteSettings у файл (після деплою змін store/theme.css)'
+
+    def handle(self, *args, **options):
+        settings = SiteSettings.objects.first()
+        if settings is None:
+            self.stdout.write("Налаштування сайту ще не створено: тема вбудовується в сторінку")
+            return
+        name = theme.build(settings)
+        site.invalidate()
+        self.stdout.write(f"✅ {theme.path(name)}")
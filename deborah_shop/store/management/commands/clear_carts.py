@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from store import cart, orders
+
+
+class Command(BaseCommand):
+    help = 'Видалення анонімних кошиків, що не змінювалися довше cart.CART_TTL, і ключів оформлення старших за orders.KEY_TTL (для cron)'
+
+    def handle(self, *args, **options):
+        deleted, _ = cart.expired().delete()
+        deleted += orders.expired_keys().delete()[0]
+        self.stdout.write(f"✅ Видалено записів: {deleted}")
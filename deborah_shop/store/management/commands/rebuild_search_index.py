@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from store import search
+
+
+class Command(BaseCommand):
+    help = 'Повна перебудова повнотекстового індексу товарів (FTS5)'
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            self.stderr.write("❌ FTS5 доступний лише для SQLite")
+            return
+        self.stdout.write(f"✅ Проіндексовано товарів: {search.rebuild()}")
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from store import sales
+
+
+class Command(BaseCommand):
+    help = 'Перерахунок лічильників продажів товарів (units_sold / revenue) з OrderItem'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"✅ Оновлено товарів: {sales.reconcile()}")
@@ -0,0 +1,37 @@
+# Повнотекстовий індекс товарів (SQLite FTS5), див. store/search.py
+
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS store_product_fts "
+    "USING fts5(name, description, category, tokenize='unicode61 remove_diacritics 2')"
+)
+FILL_SQL = (
+    "INSERT INTO store_product_fts(rowid, name, description, category) "
+    "SELECT p.id, p.name, p.description, c.name FROM store_product p "
+    "JOIN store_category c ON c.id = p.category_id WHERE p.is_active"
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(FILL_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS store_product_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0014_landingpage_alter_productimage_options_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_attributes(apps, schema_editor):
+    Product = apps.get_model("store", "Product")
+    ProductAttribute = apps.get_model("store", "ProductAttribute")
+    attrs = []
+    for p in Product.objects.only("id", "sizes", "colors").iterator():
+        for kind, raw in (("size", p.sizes), ("color", p.colors)):
+            values = {
+                v.strip().lower(): v.strip()
+                for v in (raw or "").split(",")
+                if v.strip()
+            }
+            attrs += [
+                ProductAttribute(product_id=p.id, kind=kind, value=v[:50])
+                for v in values.values()
+            ]
+    ProductAttribute.objects.bulk_create(attrs, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0015_product_fts_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductAttribute",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("size", "Розмір"), ("color", "Колір")], max_length=10
+                    ),
+                ),
+                ("value", models.CharField(max_length=50)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attributes",
+                        to="store.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Атрибут товару",
+                "verbose_name_plural": "Атрибути товарів",
+                "indexes": [
+                    models.Index(
+                        fields=["kind", "value", "product"], name="attr_kind_value_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "kind", "value"),
+                        name="uniq_product_attribute",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_attributes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:22
+
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Product = apps.get_model("store", "Product")
+    OrderItem = apps.get_model("store", "OrderItem")
+    items = OrderItem.objects.filter(product=OuterRef("pk")).values("product")
+    units = items.annotate(s=Sum("quantity")).values("s")
+    revenue = items.annotate(
+        s=Sum(
+            ExpressionWrapper(F("price") * F("quantity"), output_field=DecimalField())
+        )
+    ).values("s")
+    Product.objects.update(
+        units_sold=Coalesce(Subquery(units), 0), revenue=Coalesce(Subquery(revenue), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0017_product_catalog_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="revenue",
+            field=models.DecimalField(
+                decimal_places=0,
+                default=0,
+                editable=False,
+                max_digits=12,
+                verbose_name="Виручка",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="units_sold",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Продано, шт"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["units_sold"],
+                name="product_active_sold_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["category", "units_sold"],
+                name="product_cat_sold_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:25
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    Product = apps.get_model("store", "Product")
+    Review = apps.get_model("store", "Review")
+    reviews = Review.objects.filter(product=OuterRef("pk")).values("product")
+    Product.objects.update(
+        rating_avg=Coalesce(
+            Subquery(reviews.annotate(a=Avg("rating")).values("a")), 0.0
+        ),
+        rating_count=Coalesce(Subquery(reviews.annotate(c=Count("id")).values("c")), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0019_copurchase_recommendations"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="rating_avg",
+            field=models.FloatField(
+                default=0, editable=False, verbose_name="Середній рейтинг"
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Відгуків"
+            ),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
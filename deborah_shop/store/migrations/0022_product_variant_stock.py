@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0021_cart_storage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductVariant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "size",
+                    models.CharField(blank=True, max_length=50, verbose_name="Розмір"),
+                ),
+                (
+                    "color",
+                    models.CharField(blank=True, max_length=50, verbose_name="Колір"),
+                ),
+                (
+                    "stock",
+                    models.PositiveIntegerField(default=0, verbose_name="Залишок"),
+                ),
+            ],
+            options={
+                "verbose_name": "Варіант",
+                "verbose_name_plural": "Варіанти",
+                "ordering": ["id"],
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name="cartline",
+            name="uniq_cart_product",
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("new", "Новий"),
+                    ("sent", "Відправлено"),
+                    ("done", "Виконано"),
+                    ("cancelled", "Скасовано"),
+                ],
+                default="new",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="productvariant",
+            name="product",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="variants",
+                to="store.product",
+            ),
+        ),
+        migrations.AddField(
+            model_name="cartline",
+            name="variant",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="store.productvariant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="variant",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="store.productvariant",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="cartline",
+            constraint=models.UniqueConstraint(
+                fields=("cart", "product", "variant"), name="uniq_cart_variant"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="cartline",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("variant__isnull", True)),
+                fields=("cart", "product"),
+                name="uniq_cart_product",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="productvariant",
+            constraint=models.UniqueConstraint(
+                fields=("product", "size", "color"), name="uniq_product_variant"
+            ),
+        ),
+    ]
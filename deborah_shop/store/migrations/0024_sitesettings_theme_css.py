@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0023_checkout_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitesettings",
+            name="theme_css",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, verbose_name="Файл теми"
+            ),
+        ),
+    ]
@@ -65,6 +65,9 @@ class SiteSettings(models.Model):
     google_analytics_id = models.CharField("GA4 ID", max_length=50, blank=True)
     facebook_pixel_id = models.CharField("FB Pixel ID", max_length=50, blank=True)
 
+    # Ім'я скомпільованого файлу теми (store/theme.py), заповнюється при збереженні
+    theme_css = models.CharField("Файл теми", max_length=64, blank=True, editable=False)
+
     def save(self, *args, **kwargs):
         if not self.pk and SiteSettings.objects.exists():
             raise ValidationError('Дозволено лише одне налаштування')
@@ -82,7 +85,7 @@ class Profile(models.Model):
 class Category(models.Model):
     name = models.CharField("Назва", max_length=100)
     slug = models.SlugField(unique=True)
-    def get_absolute_url(self): return f"/?category={self.slug}"
+    def get_absolute_url(self): return f"{reverse('home')}?category={self.slug}"
     class Meta: verbose_name = "Категорія"; verbose_name_plural = "Категорії"
     def __str__(self): return self.name
 
@@ -98,11 +101,57 @@ class Product(models.Model):
     colors = models.CharField("Кольори", max_length=200, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Остання зміна сторінки товару (ETag / Last-Modified, store/conditional.py): крім save() оновлюється
+    # явно при зміні фото, відгуків і залишків, бо ті пишуться UPDATE без save()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    # Лічильники продажів: оновлюються при створенні замовлення (store/sales.py), звіряються manage.py reconcile_sales
+    units_sold = models.PositiveIntegerField("Продано, шт", default=0, editable=False)
+    revenue = models.DecimalField("Виручка", max_digits=12, decimal_places=0, default=0, editable=False)
+    
+    # Рейтинг з відгуків: оновлюється атомарно сигналами Review (store/reviews.py)
+    rating_avg = models.FloatField("Середній рейтинг", default=0, editable=False)
+    rating_count = models.PositiveIntegerField("Відгуків", default=0, editable=False)
     
     def get_absolute_url(self): return reverse('product_detail', args=[str(self.id)])
-    class Meta: verbose_name = "Товар"; verbose_name_plural = "Товари"; ordering = ['-created_at']
+    class Meta:
+        verbose_name = "Товар"; verbose_name_plural = "Товари"; ordering = ['-created_at']
+        # Часткові індекси під кожну комбінацію фільтр + сортування каталогу (store/catalog.py SORTS);
+        # вітрина бачить лише активні товари, а id SQLite додає в кінець індексу сам
+        indexes = [
+            models.Index(fields=['created_at'], condition=models.Q(is_active=True), name='product_active_new_idx'),
+            models.Index(fields=['price'], condition=models.Q(is_active=True), name='product_active_price_idx'),
+            models.Index(fields=['category', 'created_at'], condition=models.Q(is_active=True), name='product_cat_new_idx'),
+            models.Index(fields=['category', 'price'], condition=models.Q(is_active=True), name='product_cat_price_idx'),
+            models.Index(fields=['units_sold'], condition=models.Q(is_active=True), name='product_active_sold_idx'),
+            models.Index(fields=['category', 'units_sold'], condition=models.Q(is_active=True), name='product_cat_sold_idx'),
+        ]
     def __str__(self): return self.name
 
+class ProductAttribute(models.Model):
+    """Нормалізовані розміри/кольори товару для фільтрів (заповнюється з Product.sizes / colors, див. store/facets.py)"""
+    KIND_CHOICES = [('size', 'Розмір'), ('color', 'Колір')]
+    product = models.ForeignKey(Product, related_name='attributes', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=50)
+    class Meta:
+        verbose_name = "Атрибут товару"; verbose_name_plural = "Атрибути товарів"
+        constraints = [models.UniqueConstraint(fields=['product', 'kind', 'value'], name='uniq_product_attribute')]
+        indexes = [models.Index(fields=['kind', 'value', 'product'], name='attr_kind_value_idx')]
+    def __str__(self): return f"{self.kind}: {self.value}"
+
+class ProductVariant(models.Model):
+    """Варіант товару (розмір / колір) зі своїм залишком; товари без варіантів продаються без обліку залишку"""
+    product = models.ForeignKey(Product, related_name='variants', on_delete=models.CASCADE)
+    size = models.CharField("Розмір", max_length=50, blank=True)
+    color = models.CharField("Колір", max_length=50, blank=True)
+    # Positive = CHECK (stock >= 0) в БД як остання страховка; списання - умовним UPDATE (store/stock.py)
+    stock = models.PositiveIntegerField("Залишок", default=0)
+    class Meta:
+        verbose_name = "Варіант"; verbose_name_plural = "Варіанти"; ordering = ['id']
+        constraints = [models.UniqueConstraint(fields=['product', 'size', 'color'], name='uniq_product_variant')]
+    def __str__(self): return ' / '.join(v for v in (self.size, self.color) if v) or f"#{self.id}"
+
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField("Фото", upload_to='products/gallery/')
@@ -117,7 +166,7 @@ class Review(models.Model):
     class Meta: verbose_name = "Відгук"; verbose_name_plural = "Відгуки"
 
 class Order(models.Model):
-    STATUS_CHOICES = [('new', 'Новий'), ('sent', 'Відправлено'), ('done', 'Виконано')]
+    STATUS_CHOICES = [('new', 'Новий'), ('sent', 'Відправлено'), ('done', 'Виконано'), ('cancelled', 'Скасовано')]
     PAYMENT_CHOICES = [('wayforpay', 'WayForPay'), ('liqpay', 'LiqPay'), ('cod', 'Накладений'), ('cash', 'Готівка')]
 
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -144,9 +193,68 @@ class Order(models.Model):
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    variant = models.ForeignKey(ProductVariant, null=True, blank=True, related_name='+', on_delete=models.SET_NULL)
     price = models.DecimalField(max_digits=10, decimal_places=0)
     quantity = models.PositiveIntegerField(default=1)
-    def __str__(self): return f"{self.product.name} x {self.quantity}"
+    def __str__(self): return f"{self.product.name}{f' ({self.variant})' if self.variant_id else ''} x {self.quantity}"
+
+class CheckoutKey(models.Model):
+    """Ключ ідемпотентності форми оформлення: повторний POST з тим самим ключем повертає вже створене замовлення"""
+    key = models.UUIDField(unique=True)
+    order = models.ForeignKey(Order, null=True, blank=True, related_name='+', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    def __str__(self): return str(self.key)
+
+# --- КОШИК (зберігається в БД, у сесії лише id) ---
+class Cart(models.Model):
+    """Кошик відвідувача (user=None) або користувача; анонімні без змін довше CART_TTL видаляє manage.py clear_carts"""
+    user = models.OneToOneField(User, null=True, blank=True, related_name='cart', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    class Meta: verbose_name = "Кошик"; verbose_name_plural = "Кошики"
+    def __str__(self): return f"Кошик #{self.id} ({self.user or 'гість'})"
+
+class CartLine(models.Model):
+    cart = models.ForeignKey(Cart, related_name='lines', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    variant = models.ForeignKey(ProductVariant, null=True, blank=True, related_name='+', on_delete=models.CASCADE)
+    # Звичайне ціле (не Positive): паралельні F('quantity') - 1 не впираються в CHECK, рядки <= 0 видаляються
+    quantity = models.IntegerField(default=0)
+    class Meta:
+        # NULL у UNIQUE не збігаються між собою, тому рядок без варіанта має окреме часткове обмеження
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product', 'variant'], name='uniq_cart_variant'),
+            models.UniqueConstraint(fields=['cart', 'product'], condition=models.Q(variant__isnull=True), name='uniq_cart_product'),
+        ]
+    def __str__(self): return f"{self.product_id} x {self.quantity}"
+
+# --- РЕКОМЕНДАЦІЇ ("разом купують") ---
+class CoPurchase(models.Model):
+    """Матриця спільних покупок: скільки замовлень містили обидва товари (зберігаються обидва напрямки)"""
+    product = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    other = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['product', 'other'], name='uniq_copurchase_pair')]
+        indexes = [models.Index(fields=['product', '-count'], name='copurchase_top_idx')]
+
+class ProductRecommendation(models.Model):
+    """Top-N сусідів товару з CoPurchase, готові для product_detail (manage.py build_recommendations)"""
+    product = models.ForeignKey(Product, related_name='recommendations', on_delete=models.CASCADE)
+    recommended = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    score = models.PositiveIntegerField(default=0)
+    position = models.PositiveSmallIntegerField(default=0)
+    class Meta:
+        verbose_name = "Рекомендація"; verbose_name_plural = "Рекомендації"; ordering = ['position']
+        indexes = [models.Index(fields=['product', 'position'], name='recommendation_pos_idx')]
+
+class JobCheckpoint(models.Model):
+    """Позиція інкрементальних фонових задач (останній оброблений id)"""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    def __str__(self): return f"{self.name}: {self.last_id}"
+
 # --- LANDING PAGES (ПРОМО-СТОРІНКИ) ---
 
 class LandingPage(models.Model):
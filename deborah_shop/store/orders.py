@@ -0,0 +1,125 @@
+"""
+Оформлення замовлення одним проходом
+- Одна транзакція: замовлення з уже порахованою сумою (INSERT без повторного UPDATE), позиції одним bulk_create,
+  лічильники продажів одним UPDATE
+- Ціни беруться з уже завантажених товарів кошика (Cart.lines - один запит), без запиту на позицію
+- Залишки варіантів списуються першим записом транзакції (store/stock.py); нестача - OutOfStock і відкат;
+  позиція без варіанта для товару з варіантами (чи з чужим варіантом) - теж OutOfStock
+- Зовнішні побічні ефекти (повідомлення в Telegram) - лише після коміту, через transaction.on_commit,
+  щоб HTTP-запит не тримав блокування SQLite і не бачив незавершене замовлення
+- Історія замовлень у кабінеті: keyset-сторінки з позиціями одним prefetch, підсумок користувача в кеші
+- Ключ ідемпотентності (CheckoutKey): форма несе одноразовий UUID; повторний POST (подвійний клік, ретрай
+  мобільного клієнта) повертає вже створене замовлення без нового замовлення і без нового повідомлення
+"""
+import uuid
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import transaction, IntegrityError
+from django.db.models import Count, Sum, Max, Q, Prefetch
+from django.utils import timezone
+from .models import Order, OrderItem, CheckoutKey
+from . import sales, stock
+
+# Ключі старші за це видаляє manage.py clear_carts
+KEY_TTL = timedelta(days=1)
+HISTORY_PAGE_SIZE = 20
+SUMMARY_TIMEOUT = 60 * 60 * 24
+
+
+class DuplicateCheckout(Exception):
+    """Ключ уже використано паралельним запитом"""
+
+
+def create_order(lines, **fields):
+    """lines: [{'product', 'variant', 'qty'}] (формат Cart.lines); fields - поля Order. Повертає збережене замовлення"""
+    foreign = [line['product'].id for line in lines if line.get('variant') and line['variant'].product_id != line['product'].id]
+    if foreign: raise stock.OutOfStock([], foreign)
+    with transaction.atomic():
+        stock.require_variants([line['product'].id for line in lines if not line.get('variant')])
+        stock.reserve([(line['variant'].id, line['qty']) for line in lines if line.get('variant')])
+        order = Order.objects.create(total_price=sum(line['product'].price * line['qty'] for line in lines), **fields)
+        items = OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=line['product'], variant=line.get('variant'), price=line['product'].price, quantity=line['qty'])
+            for line in lines
+        ])
+        sales.record_items(items)
+    return order
+
+
+def cancel_order(order):
+    """Скасовує замовлення і повертає залишки; повторне скасування нічого не робить. True, якщо скасовано зараз"""
+    with transaction.atomic():
+        if not Order.objects.filter(pk=order.pk).exclude(status='cancelled').update(status='cancelled'): return False
+        items = list(order.items.all())
+        stock.release([(item.variant_id, item.quantity) for item in items])
+        # Лічильники продажів рахують лише нескасовані замовлення, як і sales.reconcile
+        sales.revert_items(items)
+    order.status = 'cancelled'
+    invalidate_summary(order.user_id)
+    return True
+
+
+def new_checkout_key():
+    return str(uuid.uuid4())
+
+
+def parse_key(raw):
+    try: return uuid.UUID(str(raw))
+    except ValueError: return None
+
+
+def replayed_order(key):
+    """Замовлення, вже створене з цим ключем, або None"""
+    if key is None: return None
+    claim = CheckoutKey.objects.filter(key=key, order__isnull=False).select_related('order').first()
+    return claim.order if claim else None
+
+
+def claim_key(key):
+    """
+    Перший запис транзакції оформлення: займає ключ (UNIQUE), щоб дубль падав одразу, а не після створення замовлення
+    Повертає CheckoutKey або None без ключа; DuplicateCheckout - ключ уже зайнято
+    """
+    if key is None: return None
+    try:
+        with transaction.atomic(): return CheckoutKey.objects.create(key=key)
+    except IntegrityError:
+        raise DuplicateCheckout(key)
+
+
+def bind_key(claim, order):
+    if claim: CheckoutKey.objects.filter(pk=claim.pk).update(order=order)
+
+
+def expired_keys():
+    return CheckoutKey.objects.filter(created_at__lt=timezone.now() - KEY_TTL)
+
+
+def history_page(user, before=None, size=HISTORY_PAGE_SIZE):
+    """(замовлення сторінки з позиціями і товарами, курсор наступної або None); новіші першими, курсор - id"""
+    orders = (
+        Order.objects.filter(user=user).order_by('-id')
+        .prefetch_related(Prefetch('items', queryset=OrderItem.objects.select_related('product').only(
+            'id', 'order_id', 'quantity', 'price', 'product__id', 'product__name'
+        )))
+    )
+    if before: orders = orders.filter(id__lt=before)
+    items = list(orders[:size + 1])
+    return items[:size], (items[size - 1].id if len(items) > size else None)
+
+
+def summary_key(user_id):
+    return f"orders:summary:{user_id}"
+
+
+def summary(user):
+    """{'count', 'spent', 'last'} одним агрегатом, у кеші до зміни замовлень користувача"""
+    def load():
+        return Order.objects.filter(user=user).aggregate(
+            count=Count('id'), spent=Sum('total_price', filter=~Q(status='cancelled'), default=0), last=Max('created_at'),
+        )
+    return cache.get_or_set(summary_key(user.pk), load, SUMMARY_TIMEOUT)
+
+
+def invalidate_summary(user_id):
+    if user_id: cache.delete(summary_key(user_id))
@@ -0,0 +1,108 @@
+"""
+Кеш сторінок вітрини для анонімних відвідувачів
+- View з декоратором @cacheable для GET/HEAD без входу віддає сторінку з кешу або позначає запит для запису;
+  PageCacheMiddleware зберігає відрендерену сторінку (лише 200). Ключ - шлях з рядком запиту,
+  мова (cookie lang) і версія кешу
+- Перевірка в декораторі, а не в middleware: умовний GET (store/conditional.py) стоїть перед ним
+  і відповідає 304 ще до читання кешу
+- Сторінка для кешу рендериться з мітками замість даних відвідувача (лічильники кошика й обраного,
+  CSRF-токен, id обраних товарів); при видачі з кешу мітки замінюються простою заміною рядків
+- Відвідувач з повідомленнями (messages) отримує звичайну сторінку: повідомлення не потрапляють у кеш
+- Версія збільшується після коміту змін товарів, категорій, налаштувань, банерів і промо-сторінок (сигнали);
+  залишки та рейтинги змінюються UPDATE без сигналів, тому сторінка живе не довше TIMEOUT
+"""
+import hashlib
+from functools import wraps
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from .cart import Cart
+from . import translations, versions
+
+VERSION_KEY = 'pagecache:version'
+TIMEOUT = 60 * 5
+HOLES = {
+    'cart_count': '__page_cart_count__',
+    'fav_count': '__page_fav_count__',
+    'fav_marks': '__page_fav_marks__',
+    'csrf_token': '__page_csrf_token__',
+}
+
+
+def applies(request):
+    return request.method in ('GET', 'HEAD') and not request.user.is_authenticated and not len(get_messages(request))
+
+
+def cacheable(view):
+    """Сторінки view кешуються для анонімних відвідувачів"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if applies(request):
+            key = page_key(request)
+            page = cache.get(key)
+            if page is not None:
+                content, content_type = page
+                response = HttpResponse(fill(request, content), content_type=content_type)
+                response['X-Page-Cache'] = 'hit'
+                return response
+            request.page_cache_key = key
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def recording(request):
+    """True, поки сторінка рендериться для кешу: дані відвідувача не можна вставляти в HTML"""
+    return getattr(request, 'page_cache_key', None) is not None
+
+
+def favorites(request):
+    """id обраних товарів для розмітки сердечок; для кешу - порожньо (заповнює JS з data-fav-ids)"""
+    return [] if recording(request) else request.session.get('favorites', [])
+
+
+def holes():
+    """Значення контексту для рендеру в кеш (context_processors.global_context)"""
+    return dict(HOLES)
+
+
+def invalidate():
+    versions.bump(VERSION_KEY)
+
+
+def page_key(request):
+    version = versions.get(VERSION_KEY)
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"page:{version}:{translations.get_language(request)}:{path}"
+
+
+def fill(request, content):
+    favs = request.session.get('favorites', [])
+    count = Cart(request).count
+    values = {
+        'cart_count': str(count or ''),
+        'fav_count': str(len(favs) or ''),
+        'fav_marks': ','.join(map(str, favs)),
+        'csrf_token': get_token(request),
+    }
+    for name, hole in HOLES.items(): content = content.replace(hole, values[name])
+    return content
+
+
+class PageCacheMiddleware:
+    """Після CsrfViewMiddleware, AuthenticationMiddleware і MessageMiddleware"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, 'page_cache_key', None)
+        if key is None or response.streaming: return response
+        request.page_cache_key = None
+        content = response.content.decode(response.charset)
+        if response.status_code == 200 and not get_messages(request).added_new:
+            cache.set(key, (content, response['Content-Type']), TIMEOUT)
+            response['X-Page-Cache'] = 'miss'
+        response.content = fill(request, content)
+        return response
@@ -0,0 +1,102 @@
+"""
+Рекомендації "разом купують"
+- update(): інкрементально читає нові замовлення потоком, оновлює CoPurchase і top-N лише для зачеплених товарів;
+  пачка замовлень і зсув чекпоінта комітяться разом, тож перерваний запуск продовжується з останньої пачки
+- Скасовані замовлення не враховуються; скасоване вже після обробки лишається в матриці до перерахунку --full
+- related_products(): один індексований запит для product_detail, добір сусідами з категорії
+"""
+from collections import Counter
+from datetime import timedelta
+from itertools import groupby, combinations
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Order, OrderItem, CoPurchase, ProductRecommendation, JobCheckpoint
+from . import catalog
+
+CHECKPOINT = 'copurchase'
+TOP_N = 8
+CHUNK_SIZE = 2000
+BATCH_ORDERS = 1000
+# Свіжі замовлення не чіпаємо: позиції ще можуть дописуватися
+SETTLE = timedelta(minutes=10)
+
+
+def scan_pairs(after_order_id, until_order_id, chunk_size=CHUNK_SIZE):
+    """Counter {(товар, інший): к-сть замовлень} по нескасованих замовленнях (after, until], читання чанками"""
+    pairs = Counter()
+    rows = (
+        OrderItem.objects.filter(order_id__gt=after_order_id, order_id__lte=until_order_id).exclude(order__status='cancelled')
+        .order_by('order_id').values_list('order_id', 'product_id').iterator(chunk_size=chunk_size)
+    )
+    for _, basket in groupby(rows, key=lambda row: row[0]):
+        products = sorted({pid for _, pid in basket})
+        for a, b in combinations(products, 2):
+            pairs[(a, b)] += 1
+            pairs[(b, a)] += 1
+    return pairs
+
+
+def save_pairs(pairs, chunk_size=CHUNK_SIZE):
+    """Додає приріст до CoPurchase: існуючі пари - один UPDATE ... CASE на чанк (count = count + n), нові - bulk_create"""
+    items = list(pairs.items())
+    for i in range(0, len(items), chunk_size):
+        chunk = dict(items[i:i + chunk_size])
+        existing = CoPurchase.objects.filter(product_id__in={a for a, _ in chunk}, other_id__in={b for _, b in chunk})
+        updated = []
+        for row in existing.only('id', 'product_id', 'other_id'):
+            delta = chunk.pop((row.product_id, row.other_id), None)
+            if delta:
+                row.count = F('count') + delta
+                updated.append(row)
+        CoPurchase.objects.bulk_update(updated, ['count'])
+        CoPurchase.objects.bulk_create([CoPurchase(product_id=a, other_id=b, count=n) for (a, b), n in chunk.items()])
+
+
+def refresh_top(product_ids, top_n=TOP_N):
+    """Перебудовує ProductRecommendation для вказаних товарів з CoPurchase"""
+    for pid in product_ids:
+        top = CoPurchase.objects.filter(product_id=pid).order_by('-count', 'other_id').values_list('other_id', 'count')[:top_n]
+        ProductRecommendation.objects.filter(product_id=pid).delete()
+        ProductRecommendation.objects.bulk_create([
+            ProductRecommendation(product_id=pid, recommended_id=other, score=n, position=i) for i, (other, n) in enumerate(top)
+        ])
+
+
+def update(full=False, chunk_size=CHUNK_SIZE, top_n=TOP_N, batch=BATCH_ORDERS):
+    """
+    Обробляє замовлення після чекпоінта пачками по batch замовлень, кожна пачка - окрема транзакція;
+    full=True - перерахунок з нуля. Повертає (замовлень до id, товарів оновлено)
+    """
+    if full:
+        with transaction.atomic():
+            CoPurchase.objects.all().delete()
+            ProductRecommendation.objects.all().delete()
+            JobCheckpoint.objects.update_or_create(name=CHECKPOINT, defaults={'last_id': 0})
+    settled_before = timezone.now() - SETTLE
+    touched = set()
+    while True:
+        with transaction.atomic():
+            checkpoint, _ = JobCheckpoint.objects.select_for_update().get_or_create(name=CHECKPOINT)
+            settled = Order.objects.filter(id__gt=checkpoint.last_id, created_at__lt=settled_before)
+            ids = list(settled.order_by('id').values_list('id', flat=True)[:batch])
+            if not ids: return checkpoint.last_id, len(touched)
+            pairs = scan_pairs(checkpoint.last_id, ids[-1], chunk_size)
+            save_pairs(pairs, chunk_size)
+            batch_touched = {a for a, _ in pairs}
+            refresh_top(batch_touched, top_n)
+            touched |= batch_touched
+            checkpoint.last_id = ids[-1]
+            checkpoint.save()
+
+
+def related_products(product, limit=4):
+    """Рекомендації товару (картки), добрані сусідами з тієї ж категорії до limit"""
+    related = [
+        r.recommended for r in ProductRecommendation.objects.filter(product=product, recommended__is_active=True)
+        .select_related('recommended__category').only(*(f'recommended__{f}' for f in catalog.CARD_FIELDS))[:limit]
+    ]
+    if len(related) < limit:
+        exclude = [product.id] + [p.id for p in related]
+        related += list(catalog.card_queryset().filter(category_id=product.category_id).exclude(id__in=exclude)[:limit - len(related)])
+    return related
@@ -0,0 +1,60 @@
+"""
+Відгуки товару
+- Лічильники Product.rating_avg / rating_count: один UPDATE з F-виразами на кожну зміну, без читання в Python
+- Кожна зміна також оновлює Product.updated_at (умовні GET сторінки товару)
+- Пагінація за курсором (id останнього показаного відгуку), без OFFSET і без завантаження всіх відгуків
+"""
+from django.db.models import F, Case, When, Value, FloatField
+from django.utils import timezone
+from .models import Product, Review
+
+PAGE_SIZE = 10
+
+
+def record_review(review):
+    """Новий відгук: avg' = (avg * n + r) / (n + 1)"""
+    Product.objects.filter(pk=review.product_id).update(
+        rating_avg=(F('rating_avg') * F('rating_count') + review.rating) / (F('rating_count') + 1.0),
+        rating_count=F('rating_count') + 1,
+        updated_at=timezone.now(),
+    )
+
+
+def forget_review(review):
+    """Видалений відгук: avg' = (avg * n - r) / (n - 1), для останнього відгуку - 0"""
+    Product.objects.filter(pk=review.product_id, rating_count__gt=0).update(
+        rating_avg=Case(
+            When(rating_count__lte=1, then=Value(0.0)),
+            default=(F('rating_avg') * F('rating_count') - review.rating) / (F('rating_count') - 1.0),
+            output_field=FloatField(),
+        ),
+        rating_count=F('rating_count') - 1,
+        updated_at=timezone.now(),
+    )
+
+
+def change_rating(review, old_rating):
+    """Змінена оцінка існуючого відгуку (адмінка): avg' = avg + (new - old) / n"""
+    if review.rating == old_rating: return
+    Product.objects.filter(pk=review.product_id, rating_count__gt=0).update(
+        rating_avg=F('rating_avg') + float(review.rating - old_rating) / F('rating_count'),
+        updated_at=timezone.now(),
+    )
+
+
+def page_queryset(product_id=None, after=None, size=PAGE_SIZE):
+    """size + 1 відгуків після курсора (новіші першими), з авторами; для Prefetch або прямого запиту"""
+    reviews = Review.objects.select_related('user').order_by('-id')
+    if product_id: reviews = reviews.filter(product_id=product_id)
+    if after: reviews = reviews.filter(id__lt=after)
+    return reviews[:size + 1]
+
+
+def split_page(items, size=PAGE_SIZE):
+    """(відгуки сторінки, курсор наступної або None)"""
+    items = list(items)
+    return items[:size], (items[size - 1].id if len(items) > size else None)
+
+
+def get_page(product_id, after=None, size=PAGE_SIZE):
+    return split_page(page_queryset(product_id, after, size), size)
@@ -0,0 +1,46 @@
+"""
+Матеріалізовані лічильники продажів товарів (Product.units_sold / revenue)
+- record_items: інкремент при створенні замовлення, один UPDATE ... SET x = x + CASE id ... на все замовлення
+- revert_items: те саме з мінусом при скасуванні замовлення (orders.cancel_order)
+- reconcile: повний перерахунок з OrderItem нескасованих замовлень (manage.py reconcile_sales)
+"""
+from collections import defaultdict
+from django.db.models import F, Sum, OuterRef, Subquery, DecimalField, IntegerField, ExpressionWrapper, Case, When, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Product, OrderItem
+
+
+def record_items(items):
+    """items: OrderItem (або будь-що з product_id, price, quantity) щойно створеного замовлення"""
+    _apply(items, 1)
+
+
+def revert_items(items):
+    """items: позиції скасованого замовлення"""
+    _apply(items, -1)
+
+
+def _apply(items, sign):
+    totals = defaultdict(lambda: [0, 0])
+    for item in items:
+        totals[item.product_id][0] += sign * item.quantity
+        totals[item.product_id][1] += sign * item.price * item.quantity
+    if not totals: return
+    # Один UPDATE на все замовлення: приріст кожного товару через CASE по id
+    def delta(i, field):
+        return Case(*[When(pk=pk, then=Value(v[i])) for pk, v in totals.items()], default=Value(0), output_field=field)
+    Product.objects.filter(pk__in=totals).update(
+        units_sold=F('units_sold') + delta(0, IntegerField()),
+        revenue=F('revenue') + delta(1, DecimalField(max_digits=12, decimal_places=0)),
+        # Залишки варіантів змінились у тому ж замовленні (stock.reserve): сторінка товару застаріла
+        updated_at=timezone.now(),
+    )
+
+
+def reconcile():
+    """Перераховує лічильники всіх товарів одним UPDATE, повертає кількість оновлених рядків"""
+    items = OrderItem.objects.filter(product=OuterRef('pk')).exclude(order__status='cancelled').values('product')
+    units = items.annotate(s=Sum('quantity')).values('s')
+    revenue = items.annotate(s=Sum(ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField()))).values('s')
+    return Product.objects.update(units_sold=Coalesce(Subquery(units), 0), revenue=Coalesce(Subquery(revenue), 0))
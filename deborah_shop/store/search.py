@@ -0,0 +1,86 @@
+"""
+Повнотекстовий пошук товарів (SQLite FTS5)
+- Віртуальна таблиця store_product_fts: rowid = id товару
+- Індексуються лише активні товари: назва, опис, назва категорії
+- Синхронізація через сигнали (store/signals.py), повна перебудова: manage.py rebuild_search_index
+"""
+import re
+from django.db import connection, DatabaseError
+
+TABLE = 'store_product_fts'
+SEARCH_LIMIT = 240
+
+# Ваги bm25 для колонок (name, description, category): збіг у назві важить найбільше
+RANK = f"bm25({TABLE}, 10.0, 1.0, 4.0)"
+
+CREATE_SQL = f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(name, description, category, tokenize='unicode61 remove_diacritics 2')"
+DROP_SQL = f"DROP TABLE IF EXISTS {TABLE}"
+FILL_SQL = f"""
+    INSERT INTO {TABLE}(rowid, name, description, category)
+    SELECT p.id, p.name, p.description, c.name FROM store_product p
+    JOIN store_category c ON c.id = p.category_id WHERE p.is_active
+"""
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match(q):
+    """Запит користувача -> безпечний вираз FTS5: кожне слово як префікс, усі слова обов'язкові"""
+    terms = re.findall(r'\w+', q.lower())[:8]
+    return ' '.join(f'"{t}"*' for t in terms)
+
+
+def search_ids(q, limit=SEARCH_LIMIT):
+    """id активних товарів, відсортовані за релевантністю (найкращі першими)"""
+    match = build_match(q)
+    if not match: return []
+    if not is_available(): return _fallback_ids(q, limit)
+    try:
+        with connection.cursor() as c:
+            c.execute(f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY {RANK} LIMIT %s", [match, limit])
+            return [row[0] for row in c.fetchall()]
+    except DatabaseError:
+        return _fallback_ids(q, limit)
+
+
+def _fallback_ids(q, limit):
+    from .models import Product
+    return list(Product.objects.filter(is_active=True, name__icontains=q).values_list('id', flat=True)[:limit])
+
+
+def index_product(product):
+    if not is_available(): return
+    if not product.is_active: return remove_product(product.pk)
+    with connection.cursor() as c:
+        c.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [product.pk])
+        c.execute(
+            f"INSERT INTO {TABLE}(rowid, name, description, category) SELECT %s, %s, %s, name FROM store_category WHERE id = %s",
+            [product.pk, product.name, product.description, product.category_id],
+        )
+
+
+def remove_product(pk):
+    if not is_available(): return
+    with connection.cursor() as c:
+        c.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [pk])
+
+
+def reindex_category(category):
+    if not is_available(): return
+    with connection.cursor() as c:
+        c.execute(
+            f"UPDATE {TABLE} SET category = %s WHERE rowid IN (SELECT id FROM store_product WHERE category_id = %s)",
+            [category.name, category.pk],
+        )
+
+
+def rebuild():
+    """Повна перебудова індексу, повертає кількість проіндексованих товарів"""
+    with connection.cursor() as c:
+        c.execute(DROP_SQL)
+        c.execute(CREATE_SQL)
+        c.execute(FILL_SQL)
+        c.execute(f"SELECT count(*) FROM {TABLE}")
+        return c.fetchone()[0]
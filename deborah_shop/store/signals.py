@@ -1,8 +1,13 @@
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
+from django.db import transaction
+from django.utils import timezone
 from django.contrib.auth.models import User
-from .models import Profile, Order, SiteSettings
+from django.contrib.auth.signals import user_logged_in
+from .models import Profile, Order, SiteSettings, Product, ProductImage, ProductVariant, Category, Review, TickerItem, LandingPage, LandingBlock
+from . import search, facets, suggest, reviews, cart, orders, site, theme, pagecache, landing
+from .site import get_site_settings
 from telegrambot.models import TelegramUser
 import requests
 
@@ -12,15 +17,20 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=Order)
 def notify_admin(sender, instance, created, **kwargs):
-    if created:
-        conf = SiteSettings.objects.first()
-        if conf and conf.telegram_bot_token and conf.telegram_admin_id:
-            msg = f"🔥 Замовлення #{instance.id}
-💰 {instance.total_price} грн
-📞 {instance.phone}
-📍 {instance.city}, {instance.nova_poshta}"
-            try: requests.post(f"https://api.telegram.org/bot{conf.telegram_bot_token}/sendMessage", data={'chat_id': conf.telegram_admin_id, 'text': msg})
-            except: pass
+    # Повідомлення лише після коміту: HTTP-запит не тримає транзакцію замовлення, а відкочене замовлення не надсилається
+    if created: transaction.on_commit(lambda: send_order_notification(instance))
+
+def send_order_notification(order):
+    conf = get_site_settings()
+    if conf and conf.telegram_bot_token and conf.telegram_admin_id:
+        msg = f"🔥 Замовлення #{order.id}\n💰 {order.total_price} грн\n📞 {order.phone}\n📍 {order.city}, {order.nova_poshta}"
+        try: requests.post(f"https://api.telegram.org/bot{conf.telegram_bot_token}/sendMessage", data={'chat_id': conf.telegram_admin_id, 'text': msg})
+        except: pass
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def reset_order_summary(sender, instance, **kwargs):
+    orders.invalidate_summary(instance.user_id)
 
 @receiver(pre_save, sender=Order)
 def tracking_alert(sender, instance, **kwargs):
@@ -28,11 +38,118 @@ def tracking_alert(sender, instance, **kwargs):
         try:
             old = Order.objects.get(pk=instance.pk)
             if instance.tracking_number and instance.tracking_number != old.tracking_number:
-                conf = SiteSettings.objects.first()
+                conf = get_site_settings()
                 if not conf: return
-                msg = f"🚚 Замовлення #{instance.id} відправлено!
-📦 ТТН: {instance.tracking_number}"
+                msg = f"🚚 Замовлення #{instance.id} відправлено!\n📦 ТТН: {instance.tracking_number}"
                 if instance.user:
                     tg = TelegramUser.objects.filter(user=instance.user).first()
                     if tg: requests.post(f"https://api.telegram.org/bot{conf.telegram_bot_token}/sendMessage", data={'chat_id': tg.telegram_id, 'text': msg})
         except: pass
+
+# --- НАЛАШТУВАННЯ САЙТУ (кеш процесу, store/site.py; файл теми, store/theme.py) ---
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def reset_site_settings(sender, instance, signal, **kwargs):
+    if signal is post_save and not kwargs.get('raw'): theme.build(instance)
+    site.invalidate()
+
+@receiver(post_save, sender=TickerItem)
+@receiver(post_delete, sender=TickerItem)
+@receiver(post_save, sender=LandingPage)
+@receiver(post_delete, sender=LandingPage)
+def reset_ticker(sender, **kwargs):
+    # Посилання банера на промо-сторінку залежить від її slug
+    site.invalidate_ticker()
+
+# --- КЕШ СТОРІНОК ВІТРИНИ (store/pagecache.py) ---
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+@receiver(post_save, sender=TickerItem)
+@receiver(post_delete, sender=TickerItem)
+@receiver(post_save, sender=LandingPage)
+@receiver(post_delete, sender=LandingPage)
+@receiver(post_save, sender=LandingBlock)
+@receiver(post_delete, sender=LandingBlock)
+def reset_page_cache(sender, **kwargs):
+    pagecache.invalidate()
+
+# --- ПРОМО-СТОРІНКИ (кеш HTML блоків, store/landing.py) ---
+@receiver(post_save, sender=LandingPage)
+@receiver(post_delete, sender=LandingPage)
+@receiver(post_save, sender=LandingBlock)
+@receiver(post_delete, sender=LandingBlock)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_landing(sender, instance, **kwargs):
+    landing.invalidate()
+    # Блок, збережений окремо від сторінки, теж змінює її час зміни (store/conditional.py)
+    if sender is LandingBlock: LandingPage.objects.filter(pk=instance.page_id).update(updated_at=timezone.now())
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def touch_product(sender, instance, **kwargs):
+    # Фото пишуться окремо від товару: оновлюємо час зміни сторінки товару (store/conditional.py)
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def touch_site(sender, **kwargs):
+    # Назва категорії є на сторінках товарів і в sitemap
+    site.touch()
+
+# --- ПОШУКОВИЙ ІНДЕКС ТА ФАСЕТИ ---
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    cart.forget_counts(instance.pk)
+    search.index_product(instance)
+    facets.sync_product(instance)
+    facets.invalidate()
+    suggest.update_product(instance)
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search.remove_product(instance.pk)
+    facets.invalidate()
+    suggest.remove_product(instance.pk)
+
+@receiver(post_save, sender=Category)
+def reindex_category(sender, instance, created, **kwargs):
+    if not created: search.reindex_category(instance)
+    facets.invalidate()
+    suggest.update_category(instance)
+
+@receiver(post_delete, sender=Category)
+def unindex_category(sender, instance, **kwargs):
+    facets.invalidate()
+    suggest.remove_category(instance.pk)
+
+# --- РЕЙТИНГ ТОВАРУ ---
+@receiver(pre_save, sender=Review)
+def remember_rating(sender, instance, **kwargs):
+    if instance.pk: instance._old_rating = Review.objects.filter(pk=instance.pk).values_list('rating', flat=True).first()
+
+@receiver(post_save, sender=Review)
+def update_rating(sender, instance, created, **kwargs):
+    if created: reviews.record_review(instance)
+    elif getattr(instance, '_old_rating', None) is not None: reviews.change_rating(instance, instance._old_rating)
+
+@receiver(post_delete, sender=Review)
+def drop_rating(sender, instance, **kwargs):
+    reviews.forget_review(instance)
+
+# --- КОШИК ---
+@receiver(user_logged_in)
+def merge_cart(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, 'session'): cart.merge_on_login(request, user)
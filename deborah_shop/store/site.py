@@ -0,0 +1,75 @@
+"""
+Налаштування сайту (SiteSettings - один рядок) з кешу процесу
+- get_site_settings(): об'єкт тримається в пам'яті воркера, без запитів до БД і до кешу
+- Зміна в адмінці після коміту збільшує лічильник версії в спільному кеші (store/versions.py) і скидає копію
+  свого процесу; інші воркери звіряють версію раз на MAX_AGE і перечитують рядок лише після зміни
+- Повернутий об'єкт спільний для всіх запитів процесу: лише для читання
+- get_ticker(): банери біжучої стрічки готовим списком (URL зображення, посилання) у спільному кеші
+  на TICKER_TIMEOUT, з власною версією: скидається при зміні TickerItem або LandingPage (сигнали)
+- changed_at(): час останньої зміни оформлення (налаштування, стрічка, категорії) для Last-Modified сторінок
+"""
+import threading
+import time
+from django.utils import timezone
+from django.core.cache import cache
+from django.db import transaction
+from .models import SiteSettings, TickerItem
+from . import versions
+
+VERSION_KEY = 'site_settings:version'
+TICKER_VERSION_KEY = 'site:ticker:version'
+TICKER_TIMEOUT = 60 * 60
+CHANGED_KEY = 'site:changed_at'
+CHANGED_TIMEOUT = 60 * 60 * 24
+MAX_AGE = 60
+
+_lock = threading.Lock()
+_state = {'settings': None, 'version': None, 'loaded_at': None}
+
+
+def current_version():
+    return versions.get(VERSION_KEY)
+
+
+def get_site_settings():
+    """SiteSettings або None, якщо налаштування ще не створено"""
+    state = _state
+    if state['version'] is not None and time.monotonic() - state['loaded_at'] < MAX_AGE: return state['settings']
+    version = current_version()
+    with _lock:
+        if _state['version'] != version: _state.update(settings=SiteSettings.objects.first(), version=version)
+        _state['loaded_at'] = time.monotonic()
+        return _state['settings']
+
+
+def invalidate():
+    versions.bump(VERSION_KEY)
+    transaction.on_commit(lambda: _state.update(version=None))
+    touch()
+
+
+def get_ticker():
+    """[(URL зображення, посилання)] активних банерів; посилання '#' - банер без посилання"""
+    key = f"site:ticker:{versions.get(TICKER_VERSION_KEY)}"
+    items = cache.get(key)
+    if items is None:
+        items = [
+            (item.image.url, item.get_link())
+            for item in TickerItem.objects.filter(is_active=True).select_related('link_landing') if item.image
+        ]
+        cache.set(key, items, TICKER_TIMEOUT)
+    return items
+
+
+def invalidate_ticker():
+    versions.bump(TICKER_VERSION_KEY)
+    touch()
+
+
+def changed_at():
+    """Якщо запису немає (спливло, очищення кешу) - зараз: сторінки вважаються зміненими"""
+    return cache.get_or_set(CHANGED_KEY, timezone.now, CHANGED_TIMEOUT)
+
+
+def touch():
+    transaction.on_commit(lambda: cache.set(CHANGED_KEY, timezone.now(), CHANGED_TIMEOUT))
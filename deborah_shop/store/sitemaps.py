@@ -3,5 +3,6 @@ from django.contrib.sitemaps import Sitemap
 from .models import Product, Category
 class ProductSitemap(Sitemap):
     def items(self): return Product.objects.filter(is_active=True)
+    def lastmod(self, obj): return obj.updated_at
 class CategorySitemap(Sitemap):
     def items(self): return Category.objects.all()
@@ -0,0 +1,53 @@
+"""
+Залишки варіантів товару (ProductVariant.stock)
+- reserve: списання при оформленні одним умовним UPDATE на варіант: SET stock = stock - n WHERE stock >= n
+  Рядок не читається перед записом, тому паралельні замовлення не можуть продати більше, ніж є
+- Варіанти списуються в порядку id: однаковий порядок блокувань для БД з рядковими блокуваннями
+- Викликається всередині транзакції замовлення: нестача відкочує замовлення повністю
+- require_variants: товар з варіантами не продається без варіанта (позиція з бота чи старого кошика)
+- release: повернення на склад при скасуванні замовлення (з оновленням Product.updated_at;
+  при списанні його оновлює sales.record_items тим самим UPDATE, що й лічильники продажів)
+"""
+from collections import defaultdict
+from django.db.models import F
+from django.utils import timezone
+from .models import Product, ProductVariant
+
+
+class OutOfStock(Exception):
+    def __init__(self, variant_ids, product_ids=()):
+        self.variant_ids = variant_ids
+        self.product_ids = list(product_ids)
+        super().__init__(f"Недостатньо на складі: варіанти {variant_ids}, товари без варіанта {self.product_ids}")
+
+
+def _totals(items):
+    """{variant_id: кількість} з [(variant_id, qty)], без позицій без варіанта"""
+    totals = defaultdict(int)
+    for variant_id, qty in items:
+        if variant_id: totals[variant_id] += qty
+    return dict(sorted(totals.items()))
+
+
+def reserve(items):
+    """items: [(variant_id, qty)]. Списує все або кидає OutOfStock (разом з транзакцією замовлення)"""
+    missing = [
+        variant_id for variant_id, qty in _totals(items).items()
+        if not ProductVariant.objects.filter(pk=variant_id, stock__gte=qty).update(stock=F('stock') - qty)
+    ]
+    if missing: raise OutOfStock(missing)
+
+
+def require_variants(product_ids):
+    """product_ids: товари позицій без варіанта. OutOfStock, якщо хоч один з них має варіанти"""
+    if not product_ids: return
+    missing = sorted(set(ProductVariant.objects.filter(product_id__in=product_ids).values_list('product_id', flat=True)))
+    if missing: raise OutOfStock([], missing)
+
+
+def release(items):
+    """items: [(variant_id, qty)] - повертає кількість на склад"""
+    totals = _totals(items)
+    for variant_id, qty in totals.items():
+        ProductVariant.objects.filter(pk=variant_id).update(stock=F('stock') + qty)
+    if totals: Product.objects.filter(variants__in=list(totals)).update(updated_at=timezone.now())
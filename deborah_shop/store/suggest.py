@@ -0,0 +1,109 @@
+"""
+Підказки пошуку (typeahead) з пам'яті процесу
+- Відсортовані масиви (ключ, id) окремо для категорій і товарів + bisect: пошук префікса без звернень до БД
+- Завантажується ліниво при першому запиті, далі оновлюється сигналами Product / Category
+- Сигнали бачить лише процес, що зберіг запис, тому інші воркери перечитують індекс раз на RELOAD_AFTER
+"""
+import bisect
+import threading
+import time
+from .models import Product, Category
+
+LIMIT = 8
+RELOAD_AFTER = 60 * 5
+KINDS = ('category', 'product')
+
+_lock = threading.Lock()
+_keys = {kind: [] for kind in KINDS}  # тип -> відсортовані (нормалізований ключ, id)
+_entries = {}   # (тип, id) -> {'type', 'id', 'name', 'url'}
+_loaded_at = None
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def _words(name):
+    """Ключі для запису: вся назва та кожен її хвіст від початку слова ('сукня міді' -> і 'міді')"""
+    words = normalize(name).split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+def _entry(kind, pk, name, url):
+    return {'type': kind, 'id': pk, 'name': name, 'url': url}
+
+
+def _add(kind, pk, name, url):
+    _entries[(kind, pk)] = _entry(kind, pk, name, url)
+    for key in _words(name): bisect.insort(_keys[kind], (key, pk))
+
+
+def _remove(kind, pk):
+    entry = _entries.pop((kind, pk), None)
+    if not entry: return
+    keys = _keys[kind]
+    for key in _words(entry['name']):
+        i = bisect.bisect_left(keys, (key, pk))
+        if i < len(keys) and keys[i] == (key, pk): del keys[i]
+
+
+def _load():
+    """Повне завантаження: один прохід по категоріях і товарах, одне сортування; URL - get_absolute_url, як в update_*"""
+    global _keys, _entries, _loaded_at
+    entries = {}
+    for c in Category.objects.only('id', 'name', 'slug'):
+        entries[('category', c.pk)] = _entry('category', c.pk, c.name, c.get_absolute_url())
+    for p in Product.objects.filter(is_active=True).only('id', 'name'):
+        entries[('product', p.pk)] = _entry('product', p.pk, p.name, p.get_absolute_url())
+    _keys = {kind: sorted((key, pk) for (k, pk), e in entries.items() if k == kind for key in _words(e['name'])) for kind in KINDS}
+    _entries = entries
+    _loaded_at = time.monotonic()
+
+
+def ensure_loaded():
+    if _loaded_at is not None and time.monotonic() - _loaded_at < RELOAD_AFTER: return
+    with _lock:
+        if _loaded_at is None or time.monotonic() - _loaded_at >= RELOAD_AFTER: _load()
+
+
+def suggest(prefix, limit=LIMIT):
+    """Категорії першими, далі товари; кожен запис не більше одного разу"""
+    prefix = normalize(prefix)
+    if not prefix: return []
+    ensure_loaded()
+    found, seen = [], set()
+    for kind in KINDS:
+        keys = _keys[kind]
+        i = bisect.bisect_left(keys, (prefix,))
+        while i < len(keys) and keys[i][0].startswith(prefix) and len(found) < limit:
+            pk = keys[i][1]
+            entry = _entries.get((kind, pk))
+            if entry and (kind, pk) not in seen:
+                seen.add((kind, pk))
+                found.append(entry)
+            i += 1
+    return found
+
+
+def update_product(product):
+    if _loaded_at is None: return
+    with _lock:
+        _remove('product', product.pk)
+        if product.is_active: _add('product', product.pk, product.name, product.get_absolute_url())
+
+
+def remove_product(pk):
+    if _loaded_at is None: return
+    with _lock: _remove('product', pk)
+
+
+def update_category(category):
+    if _loaded_at is None: return
+    with _lock:
+        _remove('category', category.pk)
+        _add('category', category.pk, category.name, category.get_absolute_url())
+
+
+def remove_category(pk):
+    if _loaded_at is None: return
+    with _lock: _remove('category', pk)
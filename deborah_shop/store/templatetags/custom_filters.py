@@ -20,4 +20,14 @@ def trim(value):
     """
     if value:
         return value.strip()
-    return value
\ No newline at end of file
+    return value
+
+@register.filter(name='get_item')
+def get_item(value, key):
+    """
+    Значення зі словника за ключем
+    Використання: {{ facets.category|get_item:c.slug }}
+    """
+    if value:
+        return value.get(key)
+    return None
@@ -0,0 +1,745 @@
+import io
+import itertools
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, OperationalError
+from django.http import QueryDict
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from .models import (
+    CartLine, Category, Product, SiteSettings, ProductImage, ProductVariant, Review, Order, OrderItem, CoPurchase,
+    ProductRecommendation, JobCheckpoint, LandingPage, LandingBlock, Cart as CartStore,
+)
+from . import (
+    accounts, cart, catalog, context_processors, facets, landing, orders, recommendations, search, site, stock, suggest, theme,
+    versions,
+)
+from .site import get_site_settings
+
+# Тести не чіпають спільний файловий кеш сайту
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def in_parallel(threads, attempts, buy):
+    """buy() attempts разів у кожному з threads потоків одночасно -> {результат buy() або 'locked': кількість}"""
+    results = defaultdict(int)
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker():
+        start.wait()
+        try:
+            for _ in range(attempts):
+                try: key = buy()
+                except OperationalError: key = 'locked'
+                with lock: results[key] += 1
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers: t.start()
+    for t in workers: t.join()
+    return dict(results)
+
+
+@override_settings(CACHES=LOCMEM)
+class StockConcurrencyTests(TransactionTestCase):
+    """Паралельні оформлення в окремих з'єднаннях (тестова БД у файлі, settings.DATABASES TEST)"""
+    STOCK = 30
+    THREADS = 8
+    ATTEMPTS = 6
+
+    def setUp(self):
+        cat = Category.objects.create(name='Stress', slug='stress')
+        self.product = Product.objects.create(category=cat, name='Hot SKU', price=100)
+        self.variant = ProductVariant.objects.create(product=self.product, size='M', stock=self.STOCK)
+
+    def test_parallel_checkouts_do_not_oversell(self):
+        lines = [{'product': self.product, 'variant': self.variant, 'qty': 1}]
+
+        def buy():
+            try: orders.create_order(lines, first_name='Stress', phone='0', city='-', nova_poshta='-')
+            except stock.OutOfStock: return 'out_of_stock'
+            return 'sold'
+
+        results = in_parallel(self.THREADS, self.ATTEMPTS, buy)
+        self.variant.refresh_from_db()
+        self.assertEqual(results, {'sold': self.STOCK, 'out_of_stock': self.THREADS * self.ATTEMPTS - self.STOCK})
+        self.assertEqual(Order.objects.count(), self.STOCK)
+        self.assertEqual(self.variant.stock, 0)
+
+    def test_double_cancel_releases_stock_once(self):
+        order = orders.create_order([{'product': self.product, 'variant': self.variant, 'qty': 3}], first_name='A', phone='0', city='-', nova_poshta='-')
+        self.assertTrue(orders.cancel_order(order))
+        self.assertFalse(orders.cancel_order(Order.objects.get(pk=order.pk)))
+        self.variant.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertEqual(self.variant.stock, self.STOCK)
+        self.assertEqual((self.product.units_sold, self.product.revenue), (0, 0))
+
+
+@override_settings(CACHES=LOCMEM)
+class CheckoutConcurrencyTests(TransactionTestCase):
+    """Оформлення товару без варіантів: транзакція читає до першого запису (settings.DATABASES transaction_mode)"""
+    THREADS = 8
+    ATTEMPTS = 10
+
+    def setUp(self):
+        cat = Category.objects.create(name='Stress', slug='stress')
+        self.product = Product.objects.create(category=cat, name='Basic', price=100)
+
+    def test_parallel_orders_without_variants(self):
+        lines = [{'product': self.product, 'variant': None, 'qty': 1}]
+
+        def buy():
+            orders.create_order(lines, first_name='Stress', phone='0', city='-', nova_poshta='-')
+            return 'sold'
+
+        total = self.THREADS * self.ATTEMPTS
+        self.assertEqual(in_parallel(self.THREADS, self.ATTEMPTS, buy), {'sold': total})
+        self.product.refresh_from_db()
+        self.assertEqual((Order.objects.count(), self.product.units_sold), (total, total))
+
+    def test_parallel_guest_checkouts(self):
+        phones = itertools.count()
+
+        def buy():
+            client = Client()
+            client.get(reverse('add_to_cart', args=[self.product.id]))
+            return client.post(reverse('checkout'), {
+                'phone': f'+380{next(phones):09d}', 'first_name': 'Guest', 'last_name': 'G', 'payment': 'cod',
+                'checkout_key': orders.new_checkout_key(),
+            }).status_code
+
+        threads, attempts = 4, 5
+        self.assertEqual(in_parallel(threads, attempts, buy), {200: threads * attempts})
+        self.assertEqual(Order.objects.count(), threads * attempts)
+        self.assertFalse(any(user.has_usable_password() for user in User.objects.all()))
+
+
+@override_settings(CACHES=LOCMEM)
+class CartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.dress, self.skirt = (Product.objects.create(category=cat, name=name, price=100) for name in ('Сукня', 'Спідниця'))
+        self.session = {}
+
+    def cart(self, session=None, user=None):
+        return cart.Cart(SimpleNamespace(session=self.session if session is None else session, user=user or AnonymousUser()))
+
+    def test_increments_do_not_lose_updates(self):
+        first, second = self.cart(), self.cart()
+        first.add(self.dress.id)
+        # Другий екземпляр (паралельний запит) бачить той самий кошик і додає до рядка в БД, а не до своєї копії
+        second.add(self.dress.id, 2)
+        first.add(self.dress.id, -1)
+        self.assertEqual(CartLine.objects.get().quantity, 2)
+        second.add(self.dress.id, -2)
+        self.assertFalse(CartLine.objects.exists())
+
+    def test_count_is_cached_until_change(self):
+        basket = self.cart()
+        basket.add(self.dress.id, 2)
+        with self.assertNumQueries(1): self.assertEqual(basket.count, 2)
+        with self.assertNumQueries(0): self.assertEqual(self.cart().count, 2)
+        basket.add(self.skirt.id)
+        self.assertEqual(self.cart().count, 3)
+        # Прихований товар зникає і з лічильника
+        self.skirt.is_active = False
+        self.skirt.save()
+        self.assertEqual(self.cart().count, 2)
+
+    def test_anonymous_cart_merges_on_login(self):
+        user = User.objects.create_user('buyer')
+        self.cart(session={}, user=user).add(self.dress.id)
+        self.client.get(reverse('add_to_cart', args=[self.dress.id]))
+        self.client.get(reverse('add_to_cart', args=[self.skirt.id]))
+        self.client.force_login(user)
+        self.assertEqual(CartStore.objects.get().user, user)
+        self.assertEqual(dict(CartLine.objects.values_list('product_id', 'quantity')), {self.dress.id: 2, self.skirt.id: 1})
+        self.assertContains(self.client.get(reverse('cart')), 'Спідниця')
+
+    def test_expired_anonymous_carts(self):
+        self.cart().add(self.dress.id)
+        user = User.objects.create_user('buyer')
+        self.cart(session={}, user=user).add(self.dress.id)
+        CartStore.objects.update(updated_at=timezone.now() - cart.CART_TTL - timedelta(minutes=1))
+        self.assertEqual(list(cart.expired()), [CartStore.objects.get(user=None)])
+        call_command('clear_carts', stdout=io.StringIO())
+        self.assertEqual(list(CartStore.objects.values_list('user', flat=True)), [user.id])
+
+
+@override_settings(CACHES=LOCMEM)
+class DeletedCartTests(TransactionTestCase):
+    """Зовнішній ключ CartLine перевіряється при коміті, тому - без обгортки TestCase у транзакцію"""
+
+    def test_session_with_deleted_cart_starts_new_one(self):
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        product = Product.objects.create(category=cat, name='Сукня', price=100)
+        session = {}
+        cart.Cart(SimpleNamespace(session=session, user=AnonymousUser())).add(product.id)
+        CartStore.objects.all().delete()
+        basket = cart.Cart(SimpleNamespace(session=session, user=AnonymousUser()))
+        basket.add(product.id)
+        self.assertEqual((basket.count, CartLine.objects.get().cart_id), (1, session[cart.SESSION_KEY]))
+
+
+@override_settings(CACHES=LOCMEM)
+class CartStockTests(TestCase):
+    def setUp(self):
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.product = Product.objects.create(category=cat, name='Сукня', price=100)
+        self.variant = ProductVariant.objects.create(product=self.product, size='M', stock=2)
+
+    def add(self):
+        return self.client.post(reverse('cart_add_api', args=[self.product.id]), {'variant': self.variant.id}).json()
+
+    def test_cart_cannot_hold_more_than_stock(self):
+        self.assertEqual([self.add()['cart_count'] for _ in range(2)], [1, 2])
+        self.assertNotIn('cart_count', self.add())
+        self.assertEqual(CartLine.objects.get().quantity, 2)
+
+    def test_choosing_variant_is_required(self):
+        self.assertIn('redirect', self.client.post(reverse('cart_add_api', args=[self.product.id])).json())
+        self.assertFalse(CartLine.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM)
+class CartApiTests(TestCase):
+    def setUp(self):
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.product = Product.objects.create(category=cat, name='Сукня', price=100)
+        self.sized = Product.objects.create(category=cat, name='Сукня з розміром', price=200)
+        self.variant = ProductVariant.objects.create(product=self.sized, size='M', stock=1)
+
+    def post(self, name, product_id, **data):
+        return self.client.post(reverse(name, args=[product_id]), data)
+
+    def test_add(self):
+        response = self.post('cart_add_api', self.product.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'ok': True, 'message': "Добавлено!", 'cart_count': 1})
+
+    def test_out_of_stock_is_409_and_keeps_line(self):
+        self.post('cart_add_api', self.sized.id, variant=self.variant.id)
+        response = self.post('cart_add_api', self.sized.id, variant=self.variant.id)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(response.json()['ok'])
+        response = self.post('cart_update_api', self.sized.id, action='add', variant=self.variant.id)
+        self.assertEqual(response.status_code, 409)
+        self.assertNotIn('cart_count', response.json())
+        self.assertEqual(CartLine.objects.get().quantity, 1)
+
+    def test_missing_product_is_404(self):
+        for name in ('cart_add_api', 'cart_update_api'):
+            response = self.post(name, 999, action='add')
+            self.assertEqual(response.status_code, 404)
+            self.assertFalse(response.json()['ok'])
+        self.assertEqual(self.client.get(reverse('add_to_cart', args=[999])).status_code, 404)
+        self.assertFalse(CartLine.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM)
+class ProductDetailQueriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.bare = Product.objects.create(category=cat, name='Без фото', price=100)
+        self.full = Product.objects.create(category=cat, name='З фото', price=200)
+        users = [User.objects.create_user(f'u{i}') for i in range(5)]
+        for i, user in enumerate(users):
+            ProductImage.objects.create(product=self.full, image=f'products/gallery/{i}.jpg')
+            ProductVariant.objects.create(product=self.full, size=str(i), stock=1)
+            Review.objects.create(product=self.full, user=user, rating=i + 1, text='ok')
+
+    def test_constant_query_count(self):
+        # Час зміни товару, товар з категорією, фото, варіанти, відгуки з авторами, рекомендації (2: збережені й запасні);
+        # налаштування сайту вже в кеші процесу, сторінки різних товарів - різні ключі кешу сторінок
+        get_site_settings()
+        for product in (self.bare, self.full):
+            with self.assertNumQueries(7):
+                response = self.client.get(reverse('product_detail', args=[product.id]))
+            self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM)
+class KeysetTests(TestCase):
+    def setUp(self):
+        self.cat = Category.objects.create(name='Сукні', slug='dresses')
+
+    def product(self, name, price=100):
+        return Product.objects.create(category=self.cat, name=name, price=price)
+
+    def test_pages_are_stable_while_products_are_added(self):
+        products = [self.product(f'P{i}') for i in range(25)]
+        # Однаковий час створення: порядок тримає другий ключ - id
+        Product.objects.update(created_at=products[0].created_at)
+        seen, cursor = [], None
+        while True:
+            page, cursor = catalog.get_page(catalog.card_queryset(), {'cursor': cursor}, size=10)
+            seen += page
+            if not cursor: break
+            # Новинка стає першою і не зсуває наступні сторінки
+            self.product('Новинка')
+        self.assertEqual([p.id for p in seen], sorted((p.id for p in products), reverse=True))
+
+    def test_broken_cursor_starts_over(self):
+        first = self.product('A')
+        page, _ = catalog.get_page(catalog.card_queryset(), {'sort': 'new', 'cursor': 'не курсор'})
+        self.assertEqual(page, [first])
+
+
+@override_settings(CACHES=LOCMEM)
+class SearchTests(TestCase):
+    def setUp(self):
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.in_name = Product.objects.create(category=cat, name='Червона сукня', price=100)
+        self.in_text = Product.objects.create(category=cat, name='Сукня міді', description='Тканина червона, льон', price=100)
+
+    def test_name_match_ranks_first(self):
+        self.assertEqual(search.search_ids('червона'), [self.in_name.id, self.in_text.id])
+        self.assertEqual(search.search_ids('черв'), [self.in_name.id, self.in_text.id])
+
+    def test_index_follows_product_changes(self):
+        self.in_name.name = 'Синя блуза'
+        self.in_name.save()
+        self.assertEqual(search.search_ids('червона'), [self.in_text.id])
+        self.assertEqual(search.search_ids('блуза'), [self.in_name.id])
+        self.in_text.is_active = False
+        self.in_text.save()
+        self.assertEqual(search.search_ids('червона'), [])
+        self.in_text.delete()
+        self.assertEqual(search.rebuild(), 1)
+
+
+@override_settings(CACHES=LOCMEM)
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cat = Category.objects.create(name='Сукні', slug='dresses')
+
+    def product(self, name, size, color, price):
+        return Product.objects.create(category=self.cat, name=name, sizes=size, colors=color, price=price)
+
+    def test_counts_skip_own_filter(self):
+        self.product('A', 'M', 'Red', 300)
+        self.product('B', 'M', 'Blue', 700)
+        self.product('C', 'L', 'Red', 300)
+        filters = facets.parse_filters(QueryDict('size=M'))
+        counts = facets.facet_counts(catalog.card_queryset(), filters)
+        self.assertEqual(counts['size'], {'M': 2, 'L': 1})
+        self.assertEqual(counts['color'], {'Red': 1, 'Blue': 1})
+        self.assertEqual(counts['price'], {'0-500': 1, '500-1000': 1})
+        self.assertEqual(counts['category'], {'dresses': 2})
+
+
+@override_settings(CACHES=LOCMEM)
+class SuggestTests(TestCase):
+    def setUp(self):
+        self.cat = Category.objects.create(name='Сукні міді', slug='midi')
+        self.dress = Product.objects.create(category=self.cat, name='Сукня Міді Чорна', price=100)
+        Product.objects.create(category=self.cat, name='Міді спідниця', price=100, is_active=False)
+        suggest._loaded_at = None
+        self.addCleanup(setattr, suggest, '_loaded_at', None)
+
+    def names(self, prefix):
+        return [(e['type'], e['name']) for e in suggest.suggest(prefix)]
+
+    def test_prefix_of_any_word(self):
+        self.assertEqual(self.names(' МІД '), [('category', 'Сукні міді'), ('product', 'Сукня Міді Чорна')])
+        self.assertEqual(self.names('сукня'), [('product', 'Сукня Міді Чорна')])
+        self.assertEqual(self.names('синя'), [])
+        self.assertEqual([e['url'] for e in suggest.suggest('чорн')], [reverse('product_detail', args=[self.dress.id])])
+        self.assertEqual(suggest.suggest('сукні')[0]['url'], f"{reverse('home')}?category=midi")
+
+    def test_changes_update_loaded_index(self):
+        suggest.suggest('с')
+        with self.assertNumQueries(0): suggest.suggest('сукня')
+        self.dress.name = 'Сукня Біла'
+        self.dress.save()
+        self.assertEqual(self.names('чорна'), [])
+        self.assertEqual(suggest.suggest('біла')[0]['url'], self.dress.get_absolute_url())
+        Product.objects.get(name='Міді спідниця').save(update_fields=['price'])
+        self.assertEqual(self.names('спідниця'), [])
+        self.cat.name = 'Плаття'
+        self.cat.save()
+        self.assertEqual(self.names('плаття'), [('category', 'Плаття')])
+        self.dress.delete()
+        self.assertEqual(self.names('сукня'), [])
+
+
+@override_settings(CACHES=LOCMEM)
+class SortTests(TestCase):
+    def setUp(self):
+        self.cat = Category.objects.create(name='Сукні', slug='dresses')
+
+    def test_price_pages_follow_price_then_id(self):
+        products = [Product.objects.create(category=self.cat, name=f'P{i}', price=100 + i % 3) for i in range(25)]
+        seen, cursor = [], None
+        while True:
+            page, cursor = catalog.get_page(catalog.card_queryset(), {'sort': 'price_asc', 'cursor': cursor}, size=10)
+            seen += page
+            if not cursor: break
+        self.assertEqual([p.id for p in seen], [p.id for p in sorted(products, key=lambda p: (p.price, p.id))])
+
+    def test_cursor_of_another_sort_starts_over(self):
+        products = [Product.objects.create(category=self.cat, name=f'P{i}', price=100 + i) for i in range(3)]
+        _, cursor = catalog.get_page(catalog.card_queryset(), {'sort': 'price_asc'}, size=1)
+        page, _ = catalog.get_page(catalog.card_queryset(), {'sort': 'price_desc', 'cursor': cursor}, size=1)
+        self.assertEqual(page, [products[-1]])
+
+
+@override_settings(CACHES=LOCMEM)
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.a, self.b, self.c = (Product.objects.create(category=cat, name=name, price=100) for name in 'ABC')
+
+    def order(self, *products, status='new', age=timedelta(hours=1)):
+        order = Order.objects.create(status=status)
+        for p in products: OrderItem.objects.create(order=order, product=p, price=p.price)
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - age)
+        return order
+
+    def counts(self):
+        return dict(((row.product_id, row.other_id), row.count) for row in CoPurchase.objects.all())
+
+    def test_incremental_update_adds_only_new_orders(self):
+        self.order(self.a, self.b)
+        self.order(self.a, self.c, status='cancelled')
+        fresh = self.order(self.b, self.c, age=timedelta(0))
+        recommendations.update()
+        self.assertEqual(self.counts(), {(self.a.id, self.b.id): 1, (self.b.id, self.a.id): 1})
+        last = self.order(self.a, self.b, self.c)
+        Order.objects.filter(pk=fresh.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(recommendations.update(), (last.id, 3))
+        self.assertEqual(self.counts(), {
+            (self.a.id, self.b.id): 2, (self.b.id, self.a.id): 2, (self.a.id, self.c.id): 1, (self.c.id, self.a.id): 1,
+            (self.b.id, self.c.id): 2, (self.c.id, self.b.id): 2,
+        })
+        self.assertEqual(list(ProductRecommendation.objects.filter(product=self.b).values_list('recommended_id', flat=True)), [self.a.id, self.c.id])
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        first = self.order(self.a, self.b)
+        self.order(self.a, self.b)
+        save_pairs = recommendations.save_pairs
+        calls = []
+
+        def fail_second(pairs, chunk_size):
+            calls.append(1)
+            if len(calls) == 2: raise RuntimeError
+            save_pairs(pairs, chunk_size)
+
+        with mock.patch.object(recommendations, 'save_pairs', fail_second), self.assertRaises(RuntimeError):
+            recommendations.update(batch=1)
+        # Перша пачка закомічена разом із чекпоінтом, друга відкотилася
+        self.assertEqual(JobCheckpoint.objects.get(name=recommendations.CHECKPOINT).last_id, first.id)
+        self.assertEqual(self.counts()[(self.a.id, self.b.id)], 1)
+        recommendations.update(batch=1)
+        self.assertEqual(self.counts()[(self.a.id, self.b.id)], 2)
+
+
+@override_settings(CACHES=LOCMEM)
+class RatingTests(TestCase):
+    def setUp(self):
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.product = Product.objects.create(category=cat, name='Сукня', price=100)
+        self.reviews = [
+            Review.objects.create(product=self.product, user=User.objects.create_user(f'u{r}'), rating=r, text='ok')
+            for r in (5, 4, 3)
+        ]
+
+    def rating(self):
+        self.product.refresh_from_db()
+        return self.product.rating_avg, self.product.rating_count
+
+    def test_aggregates_follow_deletes(self):
+        self.assertEqual(self.rating(), (4.0, 3))
+        self.reviews[0].delete()
+        self.assertEqual(self.rating(), (3.5, 2))
+        self.reviews[1].delete()
+        self.reviews[2].delete()
+        self.assertEqual(self.rating(), (0.0, 0))
+
+
+@override_settings(CACHES=LOCMEM)
+class CheckoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.product = Product.objects.create(category=cat, name='Сукня', price=1200)
+
+    def test_replayed_key_returns_the_same_order(self):
+        self.client.get(reverse('add_to_cart', args=[self.product.id]))
+        data = {'phone': '+380501234567', 'first_name': 'Олена', 'last_name': 'Т', 'payment': 'cod', 'checkout_key': orders.new_checkout_key()}
+        first = self.client.post(reverse('checkout'), data)
+        replay = self.client.post(reverse('checkout'), data)
+        self.assertEqual((first.status_code, replay.status_code), (200, 200))
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(replay.context['order'], first.context['order'])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.units_sold, 1)
+
+
+@override_settings(CACHES=LOCMEM)
+class AccountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.product = Product.objects.create(category=cat, name='Сукня', price=1200)
+
+    def checkout(self, client, phone='+380501234567'):
+        client.get(reverse('add_to_cart', args=[self.product.id]))
+        data = {'phone': phone, 'first_name': 'Олена', 'last_name': 'Т', 'payment': 'cod', 'checkout_key': orders.new_checkout_key()}
+        return client.post(reverse('checkout'), data)
+
+    def test_new_buyer_gets_guest_account(self):
+        self.checkout(self.client)
+        user = User.objects.get()
+        self.assertEqual((user.username, user.profile.phone), ('380501234567', '+380501234567'))
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+        # Той самий телефон з іншого браузера: замовлення до наявного акаунта, без входу в нього
+        other = Client()
+        self.checkout(other)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Order.objects.filter(user=user).count(), 2)
+        self.assertEqual(other.get(reverse('profile')).status_code, 302)
+
+    def test_login_link_is_single_use(self):
+        user = accounts.create_guest('+380501234567')
+        path = accounts.login_path(user)
+        self.assertRedirects(self.client.get(path), reverse('profile'))
+        self.client.logout()
+        self.assertRedirects(self.client.get(path), reverse('auth'), fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 302)
+
+    def test_guest_sets_password_without_old_one(self):
+        user = accounts.create_guest('+380501234567')
+        self.client.force_login(user)
+        self.client.post(reverse('set_password'), {'new_password1': 'Dress-2024!', 'new_password2': 'Dress-2024!'})
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('Dress-2024!'))
+        # Тепер пароль є: без старого не змінюється, сесія лишається дійсною
+        self.client.post(reverse('set_password'), {'new_password1': 'Other-2024!', 'new_password2': 'Other-2024!'})
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('Dress-2024!'))
+        data = {'old_password': 'Dress-2024!', 'new_password1': 'Other-2024!', 'new_password2': 'Other-2024!'}
+        self.client.post(reverse('set_password'), data)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('Other-2024!'))
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM)
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.product = Product.objects.create(category=cat, name='Сукня', price=100)
+        self.user = User.objects.create_user('buyer')
+
+    def order(self, qty=1):
+        return orders.create_order([{'product': self.product, 'variant': None, 'qty': qty}], user=self.user)
+
+    def test_pages_end_exactly(self):
+        ids = [self.order().id for _ in range(4)][::-1]
+        page, cursor = orders.history_page(self.user, size=2)
+        self.assertEqual(([o.id for o in page], cursor), (ids[:2], ids[1]))
+        page, cursor = orders.history_page(self.user, cursor, size=2)
+        # Остання повна сторінка не дає курсора на порожню
+        self.assertEqual(([o.id for o in page], cursor), (ids[2:], None))
+        self.assertEqual(orders.history_page(self.user, ids[-1], size=2), ([], None))
+        self.order()
+        self.assertEqual(orders.history_page(self.user, size=5)[1], None)
+
+    def test_items_are_prefetched(self):
+        for _ in range(3): self.order()
+        with self.assertNumQueries(2):
+            page, _ = orders.history_page(self.user)
+            self.assertEqual([item.product.name for o in page for item in o.items.all()], ['Сукня'] * 3)
+
+    def test_summary_is_cached_until_orders_change(self):
+        first = self.order()
+        self.assertEqual(orders.summary(self.user)['count'], 1)
+        with self.assertNumQueries(0): orders.summary(self.user)
+        self.order(3)
+        self.assertEqual((orders.summary(self.user)['count'], orders.summary(self.user)['spent']), (2, 400))
+        orders.cancel_order(first)
+        self.assertEqual((orders.summary(self.user)['count'], orders.summary(self.user)['spent']), (2, 300))
+
+
+@override_settings(CACHES=LOCMEM)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.product = Product.objects.create(category=cat, name='Сукня', price=100)
+
+    def test_cached_page_gets_visitor_values(self):
+        self.assertEqual(self.client.get('/')['X-Page-Cache'], 'miss')
+        buyer = Client()
+        buyer.get(reverse('add_to_cart', args=[self.product.id]))
+        buyer.get(reverse('cart'))  # повідомлення "Добавлено!" показане
+        response = buyer.get('/')
+        content = response.content.decode()
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertNotIn('__page_', content)
+        self.assertIn('data-cart-count>1<', content)
+
+    def test_visitor_with_messages_bypasses_cache(self):
+        self.client.get('/')
+        self.client.get(reverse('add_to_cart', args=[self.product.id]))
+        response = self.client.get('/')
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertContains(response, 'Добавлено!')
+
+
+@override_settings(CACHES=LOCMEM)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.product = Product.objects.create(category=cat, name='Сукня', price=100)
+
+    def test_unchanged_product_page_is_304(self):
+        url = reverse('product_detail', args=[self.product.id])
+        self.client.get(url)  # перший візит отримує CSRF-cookie, що входить в ETag
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.product.name = 'Нова назва'
+        self.product.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM)
+class SiteSettingsTests(TestCase):
+    def setUp(self):
+        # Збереження налаштувань будує файл теми (store/theme.py)
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        cache.clear()
+        site._state.update(version=None)
+        self.settings = SiteSettings.objects.create(site_name='DEBORAH')
+
+    def test_steady_state_reads_nothing(self):
+        get_site_settings()
+        with self.assertNumQueries(0), mock.patch.object(versions, 'cache') as shared:
+            self.assertEqual(get_site_settings().site_name, 'DEBORAH')
+        self.assertFalse(shared.method_calls)
+
+    def test_save_reloads_after_commit(self):
+        get_site_settings()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.settings.site_name = 'NEW'
+            self.settings.save()
+        self.assertEqual(get_site_settings().site_name, 'NEW')
+
+    def test_other_process_change_is_seen_after_max_age(self):
+        get_site_settings()
+        SiteSettings.objects.update(site_name='NEW')
+        versions._bump(site.VERSION_KEY)
+        self.assertEqual(get_site_settings().site_name, 'DEBORAH')
+        site._state['loaded_at'] -= site.MAX_AGE
+        self.assertEqual(get_site_settings().site_name, 'NEW')
+
+
+@override_settings(CACHES=LOCMEM)
+class StorefrontContextTests(TestCase):
+    """Контекст вітрини: модальне вікно і адмінка не читають налаштувань сайту й стрічки"""
+    def setUp(self):
+        cache.clear()
+        site._state.update(version=None)
+        cat = Category.objects.create(name='Сукні', slug='dresses')
+        self.products = [Product.objects.create(category=cat, name=f'Сукня {i}', price=100) for i in range(5)]
+        self.client.force_login(User.objects.create_superuser('admin'))
+
+    def test_modal_queries(self):
+        # Час зміни товару (умовний GET) і товар з категорією
+        for product in (self.products[0], self.products[-1]):
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse('get_product_modal', args=[product.id]))
+            self.assertIn('Сукні', response.json()['html'])
+
+    def test_admin_changelists_skip_storefront_context(self):
+        # Сесія, користувач, два COUNT, рядки, фільтри й дати змінного списку і EXISTS налаштувань для меню адмінки;
+        # жодного SiteSettings.objects.first(), стрічки чи кошика
+        for name in ('store_product_changelist', 'store_order_changelist'):
+            with self.assertNumQueries(9), mock.patch.object(context_processors, 'Cart') as cart:
+                self.assertEqual(self.client.get(reverse(f'admin:{name}')).status_code, 200)
+            self.assertFalse(cart.called)
+
+
+@override_settings(CACHES=LOCMEM)
+class ThemeTests(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        self.settings = SiteSettings.objects.create(site_name='DEBORAH', header_bg_color='#ffffff')
+
+    def test_name_follows_content(self):
+        first = self.settings.theme_css
+        self.settings.site_name = 'Deborah'
+        self.settings.save()
+        self.assertEqual(self.settings.theme_css, first)
+        self.settings.header_bg_color = '#000000'
+        self.settings.save()
+        self.assertNotEqual(self.settings.theme_css, first)
+        self.assertEqual(SiteSettings.objects.get().theme_css, self.settings.theme_css)
+        for name in (first, self.settings.theme_css):
+            response = self.client.get(reverse('theme_css', args=[name]))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn(b'#000000', b''.join(response.streaming_content))
+
+    def test_unknown_names_are_404(self):
+        for name in ('0' * theme.NAME_LENGTH, 'not-a-theme', self.settings.theme_css.upper()):
+            self.assertEqual(self.client.get(reverse('theme_css', args=[name])).status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM)
+class LandingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dresses = Category.objects.create(name='Сукні', slug='dresses')
+        self.shoes = Category.objects.create(name='Взуття', slug='shoes')
+        self.products = [Product.objects.create(category=self.dresses, name=f'Сукня {i}', price=100) for i in range(5)]
+        Product.objects.create(category=self.dresses, name='Прихована', price=100, is_active=False)
+        self.shoe = Product.objects.create(category=self.shoes, name='Туфлі', price=100)
+        self.page = LandingPage.objects.create(title='Літо', slug='summer')
+        for category, limit in ((self.dresses, 2), (self.dresses, 3), (self.shoes, 4)):
+            LandingBlock.objects.create(page=self.page, block_type='products', products_category=category, products_limit=limit)
+        LandingBlock.objects.create(page=self.page, block_type='text', text_content='Знижки')
+
+    def render(self):
+        return str(landing.render_blocks(RequestFactory().get('/'), self.page))
+
+    def test_blocks_and_products_in_two_queries(self):
+        with self.assertNumQueries(2): blocks = landing.load_blocks(self.page)
+        newest = [p.id for p in reversed(self.products)]
+        self.assertEqual([[p.id for p in block.products] for block in blocks], [newest[:2], newest[:3], [self.shoe.id], []])
+
+    def test_rendered_blocks_are_cached(self):
+        # Сторінка цілком: час зміни, сторінка, блоки, товари; повторно - лише час зміни (кеш сторінок)
+        url = reverse('landing_page', args=['summer'])
+        with self.assertNumQueries(4): self.client.get(url)
+        with self.assertNumQueries(1): self.client.get(url)
+        cache.clear()
+        with self.assertNumQueries(2): self.render()
+        with self.assertNumQueries(0): html = self.render()
+        self.assertIn('Сукня 4', html)
+
+    def test_product_change_resets_cache(self):
+        self.render()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(category=self.dresses, name='Новинка', price=100)
+        self.assertIn('Новинка', self.render())
+
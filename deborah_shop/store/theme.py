@@ -0,0 +1,37 @@
+"""
+Тема сайту (шрифти, кольори, фони з SiteSettings) окремим CSS-файлом
+- build(): рендерить store/theme.css у media/theme/<хеш вмісту>.css і зберігає ім'я в SiteSettings.theme_css
+- Ім'я файлу - хеш вмісту: нова тема - нова адреса, тому браузер кешує файл назавжди (views.theme_css)
+  і завантажує його заново лише після зміни теми
+- Викликається при збереженні SiteSettings (сигнал) та командою manage.py build_theme
+"""
+import hashlib
+import re
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+
+DIRECTORY = 'theme'
+MAX_AGE = 60 * 60 * 24 * 365
+NAME_LENGTH = 16
+
+
+def path(name):
+    return f"{DIRECTORY}/{name}.css"
+
+
+def is_name(name):
+    """Ім'я, яке могла дати build(): hex-хеш вмісту; інші шляхи до сховища не доходять"""
+    return re.fullmatch(f"[0-9a-f]{{{NAME_LENGTH}}}", name) is not None
+
+
+def build(settings):
+    """Компілює тему, повертає ім'я файлу. Старі файли лишаються: на них можуть посилатись закешовані сторінки"""
+    css = render_to_string('store/theme.css', {'settings': settings}).encode()
+    name = hashlib.sha256(css).hexdigest()[:NAME_LENGTH]
+    if not default_storage.exists(path(name)): default_storage.save(path(name), ContentFile(css))
+    if settings.theme_css != name:
+        # update, а не save(): без повторного сигналу post_save
+        type(settings).objects.filter(pk=settings.pk).update(theme_css=name)
+        settings.theme_css = name
+    return name
@@ -0,0 +1,256 @@
+"""
+Переклади інтерфейсу (UK / EN)
+- Каталоги будуються один раз при імпорті модуля і далі лише читаються (MappingProxyType)
+- Шаблони отримують t - об'єкт каталогу поточної мови: ключ шукається при зверненні {{ t.key }},
+  відсутній в EN ключ береться з UK, відсутній зовсім - виводиться як є
+"""
+from types import MappingProxyType
+
+LANGUAGES = ('uk', 'en')
+DEFAULT_LANGUAGE = 'uk'
+
+_RAW = {
+    'uk': {
+        # Навігація
+        'home': 'Головна',
+        'collection': 'Колекція',
+        'dresses': 'Сукні',
+        'lingerie': 'Білизна',
+        'accessories': 'Аксесуари',
+        'sale': 'Розпродаж',
+        
+        # Користувач
+        'favorites': 'Обране',
+        'cart': 'Кошик',
+        'profile': 'Кабінет',
+        'login': 'Вхід',
+        'logout': 'Вихід',
+        'register': 'Реєстрація',
+        
+        # Дії
+        'add_to_cart': 'Додати в кошик',
+        'quick_view': 'Швидкий перегляд',
+        'view_details': 'Детальніше',
+        'checkout': 'Оформити замовлення',
+        'continue_shopping': 'Продовжити покупки',
+        'clear_cart': 'Очистити кошик',
+        
+        # Оформлення
+        'total': 'Разом',
+        'subtotal': 'Проміжний підсумок',
+        'payment': 'Оплата',
+        'delivery': 'Доставка',
+        'city': 'Місто',
+        'warehouse': 'Відділення',
+        'select_city': 'Оберіть місто',
+        'select_warehouse': 'Оберіть відділення',
+        
+        # Форми
+        'first_name': "Ім'я",
+        'last_name': 'Прізвище',
+        'phone': 'Телефон',
+        'email': 'Email',
+        'password': 'Пароль',
+        'confirm_password': 'Підтвердіть пароль',
+        
+        # Повідомлення
+        'order_placed': 'Дякуємо за замовлення!',
+        'empty_cart': 'Кошик порожній',
+        'no_products': 'Товарів немає',
+        'added_to_cart': 'Додано в кошик!',
+        'removed_from_cart': 'Видалено з кошика',
+        
+        # Товар
+        'details': 'Деталі',
+        'composition': 'Склад',
+        'care': 'Догляд',
+        'delivery_returns': 'Доставка та повернення',
+        'reviews': 'Відгуки',
+        'related': 'Рекомендовані товари',
+        'size': 'Розмір',
+        'color': 'Колір',
+        'select_size': 'Оберіть розмір',
+        'select_color': 'Оберіть колір',
+        'in_stock': 'В наявності',
+        'out_of_stock': 'Немає в наявності',
+        
+        # Інше
+        'search': 'Пошук',
+        'filter': 'Фільтр',
+        'sort': 'Сортувати',
+        'all': 'Всі',
+        'new': 'Новинки',
+        'price': 'Ціна',
+        'relevance': 'За релевантністю',
+        'price_asc': 'Ціна: за зростанням',
+        'price_desc': 'Ціна: за спаданням',
+        'popular': 'Популярні',
+        'free_shipping': 'Безкоштовна доставка від 2000 грн',
+        
+        # Сторінка товару
+        'composition_text': 'Склад: 100% преміум якість. Ручна робота.',
+        'delivery_text': 'Безкоштовна доставка для замовлень від 2000 грн. Повернення протягом 14 днів.',
+        'no_reviews': 'Ще немає відгуків.',
+        'more_reviews': 'Ще відгуки',
+        'your_review': 'Ваш відгук',
+        'submit': 'Надіслати',
+        
+        # Кабінет
+        'username': "Ім'я користувача",
+        'save': 'ЗБЕРЕГТИ',
+        'order_history': 'Історія замовлень',
+        'orders_count': 'Замовлень',
+        'spent': 'Всього',
+        'last_order': 'Останнє',
+        'date': 'Дата',
+        'items': 'Товари',
+        'amount': 'Сума',
+        'status': 'Статус',
+        'tracking': 'ТТН',
+        'more_orders': 'Ще замовлення',
+        'no_orders': 'Історія порожня',
+        'status_new': 'Новий',
+        'status_sent': 'Відправлено',
+        'status_cancelled': 'Скасовано',
+        'status_done': 'Виконано',
+    },
+    'en': {
+        # Navigation
+        'home': 'Home',
+        'collection': 'Collection',
+        'dresses': 'Dresses',
+        'lingerie': 'Lingerie',
+        'accessories': 'Accessories',
+        'sale': 'Sale',
+        
+        # User
+        'favorites': 'Favorites',
+        'cart': 'Cart',
+        'profile': 'Profile',
+        'login': 'Login',
+        'logout': 'Logout',
+        'register': 'Register',
+        
+        # Actions
+        'add_to_cart': 'Add to Cart',
+        'quick_view': 'Quick View',
+        'view_details': 'View Details',
+        'checkout': 'Checkout',
+        'continue_shopping': 'Continue Shopping',
+        'clear_cart': 'Clear Cart',
+        
+        # Checkout
+        'total': 'Total',
+        'subtotal': 'Subtotal',
+        'payment': 'Payment',
+        'delivery': 'Delivery',
+        'city': 'City',
+        'warehouse': 'Warehouse',
+        'select_city': 'Select city',
+        'select_warehouse': 'Select warehouse',
+        
+        # Forms
+        'first_name': 'First Name',
+        'last_name': 'Last Name',
+        'phone': 'Phone',
+        'email': 'Email',
+        'password': 'Password',
+        'confirm_password': 'Confirm Password',
+        
+        # Messages
+        'order_placed': 'Thank you for your order!',
+        'empty_cart': 'Your cart is empty',
+        'no_products': 'No products',
+        'added_to_cart': 'Added to cart!',
+        'removed_from_cart': 'Removed from cart',
+        
+        # Product
+        'details': 'Details',
+        'composition': 'Composition',
+        'care': 'Care Instructions',
+        'delivery_returns': 'Delivery & Returns',
+        'reviews': 'Reviews',
+        'related': 'Related Products',
+        'size': 'Size',
+        'color': 'Color',
+        'select_size': 'Select size',
+        'select_color': 'Select color',
+        'in_stock': 'In Stock',
+        'out_of_stock': 'Out of Stock',
+        
+        # Other
+        'search': 'Search',
+        'filter': 'Filter',
+        'sort': 'Sort',
+        'all': 'All',
+        'new': 'New Arrivals',
+        'price': 'Price',
+        'relevance': 'Relevance',
+        'price_asc': 'Price: low to high',
+        'price_desc': 'Price: high to low',
+        'popular': 'Popular',
+        'free_shipping': 'Free shipping over 2000 UAH',
+        
+        # Product page
+        'composition_text': 'Composition: 100% premium quality. Handmade.',
+        'delivery_text': 'Free delivery for orders over 2000 UAH. Returns within 14 days.',
+        'no_reviews': 'No reviews yet.',
+        'more_reviews': 'More reviews',
+        'your_review': 'Your review',
+        'submit': 'Submit',
+        
+        # Account
+        'username': 'Username',
+        'save': 'SAVE',
+        'order_history': 'Order History',
+        'orders_count': 'Orders',
+        'spent': 'Total',
+        'last_order': 'Last',
+        'date': 'Date',
+        'items': 'Items',
+        'amount': 'Amount',
+        'status': 'Status',
+        'tracking': 'Tracking',
+        'more_orders': 'More orders',
+        'no_orders': 'No orders yet',
+        'status_new': 'New',
+        'status_sent': 'Sent',
+        'status_cancelled': 'Cancelled',
+        'status_done': 'Done',
+    }
+}
+
+
+class Catalog:
+    """Каталог однієї мови для шаблонів: t.key / t['key']"""
+    __slots__ = ('lang', '_messages', '_fallback')
+
+    def __init__(self, lang, messages, fallback=None):
+        self.lang = lang
+        self._messages = MappingProxyType(dict(messages))
+        self._fallback = fallback
+
+    def __getitem__(self, key):
+        if key in self._messages: return self._messages[key]
+        return self._fallback[key] if self._fallback is not None else key
+
+    def __contains__(self, key):
+        return key in self._messages or (self._fallback is not None and key in self._fallback)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+_default = Catalog(DEFAULT_LANGUAGE, _RAW[DEFAULT_LANGUAGE])
+CATALOGS = MappingProxyType({lang: _default if lang == DEFAULT_LANGUAGE else Catalog(lang, _RAW[lang], _default) for lang in LANGUAGES})
+del _RAW
+
+
+def get_language(request):
+    """Мова з cookie lang (див. views.set_language), невідома - мова за замовчуванням"""
+    lang = request.COOKIES.get('lang', DEFAULT_LANGUAGE)
+    return lang if lang in CATALOGS else DEFAULT_LANGUAGE
+
+
+def catalog(lang):
+    return CATALOGS.get(lang, CATALOGS[DEFAULT_LANGUAGE])
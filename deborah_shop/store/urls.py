@@ -4,10 +4,18 @@ from . import views
 urlpatterns = [
     # Головна та навігація
     path('', views.home, name='home'),
+    path('catalog/more/', views.catalog_page, name='catalog_page'),
+    
+    # Пошук
+    path('api/search/', views.search_api, name='search_api'),
+    path('api/suggest/', views.suggest_api, name='suggest_api'),
     
     # Промо-сторінки
     path('page/<slug:slug>/', views.landing_page_view, name='landing_page'),
     
+    # Тема сайту (CSS з SiteSettings)
+    path('theme/<slug:name>.css', views.theme_css, name='theme_css'),
+    
     # Мультимовність
     path('set-lang/<str:lang>/', views.set_language, name='set_language'),
     
@@ -15,10 +23,14 @@ urlpatterns = [
     path('auth/', views.auth_view, name='auth'),
     path('logout/', views.logout_view, name='logout'),
     path('profile/', views.profile_view, name='profile'),
+    path('profile/orders/', views.profile_orders, name='profile_orders'),
+    path('profile/password/', views.set_password, name='set_password'),
+    path('login/<str:uidb64>/<str:token>/', views.login_link, name='login_link'),
     
     # Товари
     path('product/<int:product_id>/', views.product_detail, name='product_detail'),
     path('modal/<int:product_id>/', views.get_product_modal, name='get_product_modal'),
+    path('product/<int:product_id>/reviews/', views.product_reviews, name='product_reviews'),
     
     # Кошик та обране
     path('add/<int:product_id>/', views.add_to_cart, name='add_to_cart'),
@@ -27,6 +39,9 @@ urlpatterns = [
     path('favorites/', views.favorites_view, name='favorites'),
     path('cart/', views.cart_view, name='cart'),
     path('clear/', views.clear_cart, name='clear_cart'),
+    path('api/cart/add/<int:product_id>/', views.cart_add_api, name='cart_add_api'),
+    path('api/cart/update/<int:product_id>/', views.cart_update_api, name='cart_update_api'),
+    path('api/fav/toggle/<int:product_id>/', views.favorite_toggle_api, name='favorite_toggle_api'),
     
     # Оформлення та оплата
     path('checkout/', views.checkout, name='checkout'),
@@ -0,0 +1,31 @@
+"""
+Лічильники версій кешу (facets, site, pagecache, landing)
+- Ключі кешованих даних містять версію: bump() робить старі записи недосяжними, вони спливають самі
+- Лічильник живе обмежений час (TIMEOUT, довше за будь-який запис під ним); новий стартує з поточного
+  часу в мілісекундах, тому не повторює версію ще живих старих записів
+- bump() спрацьовує лише після коміту транзакції (on_commit): відкочене збереження не скидає кеш,
+  а паралельний запит не закешує старі рядки під новою версією до коміту
+- Кеш має бути спільним для всіх процесів (settings.CACHES), інакше воркери й бот не побачать зміни
+"""
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _fresh():
+    return time.time_ns() // 1_000_000
+
+
+def get(key):
+    return cache.get_or_set(key, _fresh, TIMEOUT)
+
+
+def _bump(key):
+    try: cache.incr(key)
+    except ValueError: cache.set(key, _fresh(), TIMEOUT)
+
+
+def bump(key):
+    transaction.on_commit(lambda: _bump(key))
@@ -1,128 +1,207 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import login, logout, authenticate, update_session_auth_hash
+from django.contrib.auth.forms import SetPasswordForm, PasswordChangeForm
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.template.loader import render_to_string
-from django.http import JsonResponse
-from django.db.models import Q
+from django.http import JsonResponse, FileResponse, Http404
+from django.core.files.storage import default_storage
 from django.views.decorators.http import require_POST
-from .models import Product, Category, Order, OrderItem, Profile, Review, SiteSettings
-import uuid
+from django.db import transaction
+from django.db.models import Prefetch
+from .models import Product, ProductVariant, Category, Order, Profile, Review, LandingPage
+from . import catalog, search, facets, suggest, recommendations, reviews, orders, stock, accounts, theme, pagecache, conditional, landing
+from .cart import Cart
+from .site import get_site_settings
 
+@pagecache.cacheable
 def home(request):
-    products = Product.objects.filter(is_active=True)
+    products = catalog.filter_products(catalog.card_queryset(), request.GET)
+    page, next_cursor = catalog.get_page(products, request.GET)
+    filters = facets.parse_filters(request.GET)
+    counts = facets.facet_counts(catalog.card_queryset(), filters)
     categories = Category.objects.all()
-    q = request.GET.get('q')
-    if q: products = products.filter(Q(name__icontains=q))
-    cat = request.GET.get('category')
-    if cat: products = products.filter(category__slug=cat)
+    favs = pagecache.favorites(request)
+    return render(request, 'store/index.html', {
+        'products': page, 'next_cursor': next_cursor, 'categories': categories, 'fav_ids': favs,
+        'filters': filters, 'facets': facets.facet_choices(counts, filters), 'sort': catalog.get_sort(request.GET),
+    })
+
+def catalog_page(request):
+    """Наступна сторінка сітки товарів (HTML-фрагмент для нескінченного скролу)"""
+    products = catalog.filter_products(catalog.card_queryset(), request.GET)
+    page, next_cursor = catalog.get_page(products, request.GET)
     favs = request.session.get('favorites', [])
-    return render(request, 'store/index.html', {'products': products, 'categories': categories, 'fav_ids': favs})
+    html = render_to_string('store/product_grid.html', {'products': page, 'fav_ids': favs})
+    return JsonResponse({'html': html, 'next': next_cursor})
+
+def search_api(request):
+    """JSON-пошук: ?q= -> товари в порядку релевантності"""
+    q = request.GET.get('q', '').strip()
+    ids = search.search_ids(q, limit=10) if q else []
+    found = catalog.card_queryset().in_bulk(ids)
+    results = [
+        {'id': p.id, 'name': p.name, 'price': str(p.price), 'category': p.category.name,
+         'url': p.get_absolute_url(), 'image': p.image.url if p.image else None}
+        for p in (found[pk] for pk in ids if pk in found)
+    ]
+    return JsonResponse({'q': q, 'results': results})
+
+def suggest_api(request):
+    """Підказки для поля пошуку: ?q=префікс, без звернень до БД"""
+    q = request.GET.get('q', '')
+    return JsonResponse({'q': q, 'results': suggest.suggest(q)})
 
+@conditional.product_page
+@pagecache.cacheable
 def product_detail(request, product_id):
-    p = get_object_or_404(Product, id=product_id)
-    favs = request.session.get('favorites', [])
-    related = Product.objects.filter(category=p.category).exclude(id=p.id)[:4]
     if request.method == 'POST' and request.user.is_authenticated:
+        p = get_object_or_404(Product.objects.only('id'), id=product_id)
         Review.objects.create(product=p, user=request.user, text=request.POST.get('text'), rating=int(request.POST.get('rating')))
         return redirect('product_detail', product_id=p.id)
-    return render(request, 'store/product_detail.html', {'product': p, 'is_fav': p.id in favs, 'related_products': related})
+    # Фіксована кількість запитів незалежно від кількості фото і відгуків:
+    # товар з категорією (рейтинг уже в рядку товару), фото, варіанти, перша сторінка відгуків з авторами, рекомендації
+    after = request.GET.get('reviews_after', '')
+    review_page = reviews.page_queryset(after=int(after) if after.isdigit() else None)
+    p = get_object_or_404(
+        Product.objects.select_related('category')
+        .prefetch_related('images', 'variants', Prefetch('reviews', queryset=review_page, to_attr='review_page')),
+        id=product_id,
+    )
+    review_list, reviews_next = reviews.split_page(p.review_page)
+    favs = pagecache.favorites(request)
+    related = recommendations.related_products(p)
+    return render(request, 'store/product_detail.html', {
+        'product': p, 'is_fav': p.id in favs, 'related_products': related,
+        'reviews': review_list, 'reviews_next': reviews_next,
+    })
+
+def product_reviews(request, product_id):
+    """Наступна сторінка відгуків (HTML-фрагмент для кнопки "Ще відгуки"), ?after=id останнього показаного"""
+    after = request.GET.get('after', '')
+    review_list, reviews_next = reviews.get_page(product_id, int(after) if after.isdigit() else None)
+    html = render_to_string('store/review_list.html', {'reviews': review_list})
+    return JsonResponse({'html': html, 'next': reviews_next})
+
+def add_line(request, product_id, variant):
+    """
+    Додає товар у кошик; None - додано, інакше 'missing' (товару немає), 'choose' (потрібен варіант) або 'out_of_stock'
+    Товар з варіантами додається лише з обраним варіантом і не більше, ніж є на складі (разом з уже доданим)
+    """
+    stock_by_variant = dict(ProductVariant.objects.filter(product_id=product_id).values_list('id', 'stock'))
+    if not stock_by_variant and not Product.objects.filter(id=product_id).exists(): return 'missing'
+    variant = int(variant) if str(variant or '').isdigit() else None
+    cart = Cart(request)
+    if stock_by_variant:
+        if variant not in stock_by_variant: return 'choose'
+        if cart.quantity(product_id, variant) + 1 > stock_by_variant[variant]: return 'out_of_stock'
+    cart.add(product_id, variant_id=variant if stock_by_variant else None)
 
 def add_to_cart(request, product_id):
-    cart = request.session.get('cart', {})
-    cart[str(product_id)] = cart.get(str(product_id), 0) + 1
-    request.session['cart'] = cart
-    messages.success(request, "Добавлено!")
+    error = add_line(request, product_id, request.GET.get('variant'))
+    if error == 'missing': raise Http404
+    if error == 'choose':
+        messages.info(request, "Оберіть розмір / колір")
+        return redirect('product_detail', product_id=product_id)
+    if error: messages.error(request, "Немає в наявності")
+    else: messages.success(request, "Добавлено!")
     return redirect(request.META.get('HTTP_REFERER', 'home'))
 
+def change_line(request, product_id):
+    """(кошик, id варіанта, помилка add_line); збільшення проходить ту саму перевірку варіанта і наявності"""
+    action = request.POST.get('action')
+    variant = request.POST.get('variant', '')
+    variant = int(variant) if variant.isdigit() else None
+    cart = Cart(request)
+    error = None
+    if action == 'add': error = add_line(request, product_id, variant)
+    elif action == 'subtract': cart.add(product_id, -1, variant_id=variant)
+    elif action == 'remove': cart.remove(product_id, variant_id=variant)
+    return Cart(request) if action == 'add' else cart, variant, error
+
 @require_POST
 def update_cart(request, product_id):
-    cart = request.session.get('cart', {})
-    str_id = str(product_id)
-    action = request.POST.get('action')
-    if action == 'add':
-        cart[str_id] = cart.get(str_id, 0) + 1
-    elif action == 'subtract':
-        cart[str_id] = cart.get(str_id, 0) - 1
-        if cart[str_id] <= 0:
-            del cart[str_id]
-    request.session['cart'] = cart
+    error = change_line(request, product_id)[2]
+    if error == 'missing': raise Http404
+    if error: messages.error(request, "Немає в наявності")
     return redirect('cart')
 
 def cart_view(request):
-    cart = request.session.get('cart', {})
-    products = []
-    total = 0
-    for pid, qty in cart.items():
-        try:
-            p = Product.objects.get(id=int(pid))
-            total += p.price * qty
-            products.append({'product': p, 'qty': qty, 'total': p.price * qty})
-        except: pass
-    settings = SiteSettings.objects.first()
+    cart = Cart(request)
+    settings = get_site_settings()
     np_key = settings.nova_poshta_api_key if settings else ''
-    return render(request, 'store/cart.html', {'cart_items': products, 'total_price': total, 'np_key': np_key})
+    return render(request, 'store/cart.html', {
+        'cart_items': cart.lines, 'total_price': cart.total, 'np_key': np_key, 'checkout_key': orders.new_checkout_key(),
+    })
 
 def clear_cart(request):
-    request.session['cart'] = {}
+    Cart(request).clear()
     return redirect('cart')
 
 def checkout(request):
     if request.method == 'POST':
-        cart = request.session.get('cart', {})
-        if not cart: return redirect('home')
+        # Повтор того самого POST (подвійний клік, ретрай) - відповідь для вже створеного замовлення
+        key = orders.parse_key(request.POST.get('checkout_key'))
+        replay = orders.replayed_order(key)
+        if replay: return order_placed(request, replay)
+        cart = Cart(request)
+        if not cart.lines: return redirect('home')
         
         phone = request.POST.get('phone')
         first_name = request.POST.get('first_name')
         pay_method = request.POST.get('payment')
         
+        # Читання до транзакції: менше часу під блокуванням запису (SQLite: BEGIN IMMEDIATE, settings.DATABASES)
         user = request.user if request.user.is_authenticated else None
         if not user:
-            try: user = Profile.objects.get(phone=phone).user
-            except:
-                pw = str(uuid.uuid4())[:8]
-                username = phone.replace('+', '')
-                user = User.objects.create_user(username=username, password=pw, first_name=first_name)
-                profile, _ = Profile.objects.get_or_create(user=user)
-                profile.phone = phone
-                profile.save()
-                messages.info(request, f"Аккаунт создан! Логин: {username}")
-
-        total = 0
-        items = []
-        for pid, qty in cart.items():
-            try:
-                p = Product.objects.get(id=int(pid))
-                total += p.price * qty
-                items.append((p, qty))
-            except: pass
-            
-        order = Order.objects.create(
-            user=user,
-            first_name=first_name,
-            last_name=request.POST.get('last_name'),
-            phone=phone,
-            city=request.POST.get('city_name') or request.POST.get('city', 'Unknown'),
-            city_ref=request.POST.get('city_ref', ''),
-            nova_poshta=request.POST.get('warehouse_name') or request.POST.get('nova_poshta', 'Unknown'),
-            warehouse_ref=request.POST.get('warehouse_ref', ''),
-            payment_method=pay_method,
-            total_price=total,
-            source='site'
-        )
-        for p, qty in items: OrderItem.objects.create(order=order, product=p, price=p.price, quantity=qty)
-        request.session['cart'] = {}
-        
-        if pay_method in ['wayforpay', 'liqpay']:
-            return redirect('payment_process', order_id=order.id)
-            
-        return render(request, 'store/success.html', {'order': order})
+            user = Profile.objects.filter(phone=phone).select_related('user').first()
+            user = user.user if user else None
+        guest = False
+        try:
+            with transaction.atomic():
+                claim = orders.claim_key(key)
+                if not user:
+                    # Без пароля: PBKDF2 не рахується в запиті оформлення, пароль покупець задасть у кабінеті
+                    user, guest = accounts.create_guest(phone, first_name), True
+
+                order = orders.create_order(
+                    cart.lines,
+                    user=user,
+                    first_name=first_name,
+                    last_name=request.POST.get('last_name'),
+                    phone=phone,
+                    city=request.POST.get('city_name') or request.POST.get('city', 'Unknown'),
+                    city_ref=request.POST.get('city_ref', ''),
+                    nova_poshta=request.POST.get('warehouse_name') or request.POST.get('nova_poshta', 'Unknown'),
+                    warehouse_ref=request.POST.get('warehouse_ref', ''),
+                    payment_method=pay_method,
+                    source='site'
+                )
+                orders.bind_key(claim, order)
+                cart.clear()
+        except orders.DuplicateCheckout:
+            replay = orders.replayed_order(key)
+            return order_placed(request, replay) if replay else redirect('cart')
+        except stock.OutOfStock:
+            messages.error(request, "Частини товарів уже немає в наявності. Перевірте кошик")
+            return redirect('cart')
+        if guest:
+            # Новий акаунт без пароля: інакше покупець не зміг би в нього увійти (store/accounts.py)
+            login(request, user, backend=accounts.BACKEND)
+            messages.info(request, f"Аккаунт создан! Логин: {user.username}. Задайте пароль у кабінеті")
+        return order_placed(request, order)
     return redirect('cart')
 
+def order_placed(request, order):
+    if order.payment_method in ['wayforpay', 'liqpay']:
+        return redirect('payment_process', order_id=order.id)
+    return render(request, 'store/success.html', {'order': order})
+
 def payment_process(request, order_id):
     order = get_object_or_404(Order, id=order_id)
-    settings = SiteSettings.objects.first()
+    settings = get_site_settings()
     
     if order.payment_method == 'wayforpay':
         if settings and settings.wfp_merchant_login:
@@ -134,18 +213,54 @@ def payment_process(request, order_id):
             
     return render(request, 'store/pay_mock.html', {'order': order})
 
+@conditional.product_fragment
 def get_product_modal(request, product_id):
-    p = get_object_or_404(Product, id=product_id)
+    p = get_object_or_404(Product.objects.select_related('category'), id=product_id)
     html = render_to_string('store/modal_content.html', {'product': p}, request=request)
     return JsonResponse({'html': html})
 
-def toggle_favorite(request, product_id):
+def switch_favorite(request, product_id):
+    """Перемикає товар в обраному (сесія), повертає (в обраному, кількість)"""
     favs = request.session.get('favorites', [])
     if product_id in favs: favs.remove(product_id)
     else: favs.append(product_id)
     request.session['favorites'] = favs
+    return product_id in favs, len(favs)
+
+def toggle_favorite(request, product_id):
+    switch_favorite(request, product_id)
     return redirect(request.META.get('HTTP_REFERER', 'home'))
 
+# --- JSON API кошика та обраного: лише лічильники і змінений фрагмент замість повної сторінки ---
+# Адреси без /api/ лишаються для роботи без JS
+
+@require_POST
+def cart_add_api(request, product_id):
+    error = add_line(request, product_id, request.POST.get('variant'))
+    if error == 'missing': return JsonResponse({'ok': False, 'message': "Товар не знайдено"}, status=404)
+    if error == 'choose': return JsonResponse({'ok': False, 'redirect': reverse('product_detail', args=[product_id])})
+    if error: return JsonResponse({'ok': False, 'message': "Немає в наявності"}, status=409)
+    return JsonResponse({'ok': True, 'message': "Добавлено!", 'cart_count': Cart(request).count})
+
+@require_POST
+def cart_update_api(request, product_id):
+    """action = add / subtract / remove; відповідь - новий рядок кошика (порожній, якщо видалено) і підсумки"""
+    cart, variant, error = change_line(request, product_id)
+    if error == 'missing': return JsonResponse({'ok': False, 'message': "Товар не знайдено"}, status=404)
+    if error: return JsonResponse({'ok': False, 'message': "Немає в наявності"}, status=409)
+    line = next((l for l in cart.lines if l['product'].id == product_id and (l['variant'].id if l['variant'] else None) == variant), None)
+    return JsonResponse({
+        'ok': True,
+        'line_html': render_to_string('store/cart_line.html', {'item': line}, request=request) if line else '',
+        'total': str(cart.total),
+        'cart_count': cart.count,
+    })
+
+@require_POST
+def favorite_toggle_api(request, product_id):
+    is_fav, fav_count = switch_favorite(request, product_id)
+    return JsonResponse({'ok': True, 'is_fav': is_fav, 'fav_count': fav_count})
+
 def favorites_view(request):
     favs = request.session.get('favorites', [])
     products = Product.objects.filter(id__in=favs)
@@ -173,13 +288,55 @@ def auth_view(request):
 
 @login_required
 def profile_view(request):
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
-    return render(request, 'store/profile.html', {'orders': orders})
+    before = request.GET.get('before', '')
+    history, next_before = orders.history_page(request.user, int(before) if before.isdigit() else None)
+    return render(request, 'store/profile.html', {
+        'orders': history, 'next_before': next_before, 'summary': orders.summary(request.user),
+    })
+
+@login_required
+def profile_orders(request):
+    """Старіші замовлення (HTML-рядки таблиці для кнопки "Ще"), ?before=id останнього показаного"""
+    before = request.GET.get('before', '')
+    history, next_before = orders.history_page(request.user, int(before) if before.isdigit() else None)
+    html = render_to_string('store/order_rows.html', {'orders': history}, request=request)
+    return JsonResponse({'html': html, 'next': next_before})
+
+def login_link(request, uidb64, token):
+    """Вхід без пароля за одноразовим посиланням (store/accounts.py)"""
+    user = accounts.user_from_link(uidb64, token)
+    if not user:
+        messages.error(request, "Посилання недійсне або вже використане")
+        return redirect('auth')
+    login(request, user, backend=accounts.BACKEND)
+    return redirect('profile')
+
+@login_required
+@require_POST
+def set_password(request):
+    """Гість (непридатний пароль) задає пароль; хто вже має пароль - лише зі старим (PasswordChangeForm)"""
+    form_class = PasswordChangeForm if request.user.has_usable_password() else SetPasswordForm
+    form = form_class(request.user, request.POST)
+    if form.is_valid():
+        update_session_auth_hash(request, form.save())
+        messages.success(request, "Пароль збережено")
+    else:
+        messages.error(request, ' '.join(e for errors in form.errors.values() for e in errors))
+    return redirect('profile')
 
 def logout_view(request):
     logout(request)
     return redirect('home')
 
+def theme_css(request, name):
+    """Скомпільована тема (store/theme.py): ім'я - хеш вмісту, тому кешується браузером назавжди"""
+    if not theme.is_name(name): raise Http404
+    try: f = default_storage.open(theme.path(name))
+    except FileNotFoundError: raise Http404
+    response = FileResponse(f, content_type='text/css')
+    response['Cache-Control'] = f'public, max-age={theme.MAX_AGE}, immutable'
+    return response
+
 def set_language(request, lang):
     """
     Зміна мови сайту (uk/en)
@@ -189,7 +346,9 @@ def set_language(request, lang):
     response.set_cookie('lang', lang, max_age=365*24*60*60)  # 1 рік
     return response
     
+@conditional.landing_page
+@pagecache.cacheable
 def landing_page_view(request, slug):
     """Відображення промо-сторінки"""
     page = get_object_or_404(LandingPage, slug=slug, is_active=True)
-    return render(request, 'store/landing_page.html', {'page': page})
\ No newline at end of file
+    return render(request, 'store/landing_page.html', {'page': page, 'blocks_html': landing.render_blocks(request, page)})
\ No newline at end of file
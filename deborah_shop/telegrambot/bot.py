@@ -4,14 +4,18 @@ import django
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, ContextTypes, filters
 from asgiref.sync import sync_to_async
-from store.models import Product, Category, Order, OrderItem, Profile, SiteSettings
+from store.models import Product, ProductVariant, Category, Order, Profile
+from store import orders, accounts, stock
+from store.site import get_site_settings
 from telegrambot.models import TelegramUser
-from django.contrib.auth.models import User
 
+# {telegram id: {(id товару, id варіанта або None): кількість}}
+# Кошик бота поки в пам'яті процесу polling, не в Cart / CartLine: у користувача до авторизації контактом
+# немає ні User, ні сесії, до яких прив'язати кошик у БД; після перезапуску бота кошики порожні
 USER_CARTS = {}
 
 async def get_token():
-    c = await sync_to_async(SiteSettings.objects.first)()
+    c = await sync_to_async(get_site_settings)()
     return c.telegram_bot_token if c else None
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -30,15 +34,10 @@ async def contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
     ph = c.phone_number
     def link():
         phone = ph if ph.startswith('+380') else '+380' + ph.lstrip('380').replace('+', '')
-        username = phone.replace('+', '')
-        try: prof = Profile.objects.get(phone=phone)
-        except:
-            u = User.objects.create_user(username=username, password='123')
-            prof, _ = Profile.objects.get_or_create(user=u)
-            prof.phone = phone
-            prof.save()
+        prof = Profile.objects.filter(phone=phone).select_related('user').first()
+        user = prof.user if prof else accounts.create_guest(phone, update.effective_user.first_name or '')
         tg = TelegramUser.objects.get(telegram_id=update.effective_user.id)
-        tg.user = prof.user
+        tg.user = user
         tg.phone_number = phone
         tg.save()
     await sync_to_async(link)()
@@ -54,33 +53,36 @@ async def catalog(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def products(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query; await q.answer()
     cid = int(q.data.split('_')[1])
-    prods = await sync_to_async(list)(Product.objects.filter(category_id=cid, is_active=True)[:5])
+    prods = await sync_to_async(list)(Product.objects.filter(category_id=cid, is_active=True).prefetch_related('variants')[:5])
     if not prods: await q.edit_message_text("Порожньо", reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙", callback_data='catalog')]])); return
     for p in prods:
-        txt = f"<b>{p.name}</b>
-{p.description[:50]}
-💰 <b>{p.price}</b>"
-        await q.message.reply_text(txt, parse_mode='HTML', reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("Купити", callback_data=f'add_{p.id}')]]))
+        txt = f"<b>{p.name}</b>\n{p.description[:50]}\n💰 <b>{p.price}</b>"
+        # Товар з варіантами купується лише обраним варіантом, що є в наявності (як на сайті)
+        variants = list(p.variants.all())
+        if variants: kb = [[InlineKeyboardButton(f"Купити {v}", callback_data=f'add_{p.id}_{v.id}')] for v in variants if v.stock]
+        else: kb = [[InlineKeyboardButton("Купити", callback_data=f'add_{p.id}')]]
+        if not kb: txt += "\n❌ Немає в наявності"
+        await q.message.reply_text(txt, parse_mode='HTML', reply_markup=InlineKeyboardMarkup(kb))
     await q.message.reply_text("---", reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙", callback_data='catalog')]]))
 
 async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query; await q.answer("Додано")
-    pid = int(q.data.split('_')[1])
+    parts = q.data.split('_')
+    key = (int(parts[1]), int(parts[2]) if len(parts) > 2 else None)
     uid = q.from_user.id
     if uid not in USER_CARTS: USER_CARTS[uid] = {}
-    USER_CARTS[uid][pid] = USER_CARTS[uid].get(pid, 0) + 1
+    USER_CARTS[uid][key] = USER_CARTS[uid].get(key, 0) + 1
 
 async def cart(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query; await q.answer()
     uid = q.from_user.id
     c = USER_CARTS.get(uid, {})
     if not c: await q.edit_message_text("Кошик порожній", reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙", callback_data='start')]])); return
-    txt = "🛒 <b>КОШИК:</b>
-"
-    for pid, qty in c.items():
+    txt = "🛒 <b>КОШИК:</b>\n"
+    for (pid, vid), qty in c.items():
         p = await sync_to_async(Product.objects.get)(id=pid)
-        txt += f"{p.name} x {qty} = {p.price*qty}
-"
+        v = await sync_to_async(ProductVariant.objects.filter(id=vid).first)() if vid else None
+        txt += f"{p.name}{f' ({v})' if v else ''} x {qty} = {p.price*qty}\n"
     kb = [[InlineKeyboardButton("✅ Замовити", callback_data='checkout')], [InlineKeyboardButton("❌ Очистити", callback_data='clear')]]
     await q.edit_message_text(txt, parse_mode='HTML', reply_markup=InlineKeyboardMarkup(kb))
 
@@ -91,16 +93,14 @@ async def checkout(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not c: return
     def mk_order():
         tg = TelegramUser.objects.get(telegram_id=uid)
-        o = Order.objects.create(user=tg.user, first_name=tg.first_name, phone=tg.phone_number or "TG", city="Bot", nova_poshta="-", source='bot')
-        tot = 0
-        for pid, qty in c.items():
-            p = Product.objects.get(id=pid)
-            tot += p.price * qty
-            OrderItem.objects.create(order=o, product=p, price=p.price, quantity=qty)
-        o.total_price = tot
-        o.save()
-        return o
-    o = await sync_to_async(mk_order)()
+        found = Product.objects.in_bulk([pid for pid, _ in c])
+        variants = ProductVariant.objects.in_bulk([vid for _, vid in c if vid])
+        lines = [{'product': found[pid], 'variant': variants.get(vid), 'qty': qty} for (pid, vid), qty in c.items() if pid in found]
+        return orders.create_order(lines, user=tg.user, first_name=tg.first_name, phone=tg.phone_number or "TG", city="Bot", nova_poshta="-", source='bot')
+    try: o = await sync_to_async(mk_order)()
+    except stock.OutOfStock:
+        await q.edit_message_text("❌ Частини товарів уже немає в наявності", reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🛒 Кошик", callback_data='cart')]]))
+        return
     USER_CARTS[uid] = {}
     await q.edit_message_text(f"Замовлення #{o.id} прийнято!", reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙", callback_data='start')]]))
 